@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+
+from recommender import build_lock, read_model_meta, staging_directory, top_k_indices
+
+ANN_DIR = "ann"
+
+
+# ===============================
+# INDEKS ANN: SVD + IVF
+# ===============================
+# Vektor TF-IDF aktor diproyeksikan ke embedding padat berdimensi kecil
+# (TruncatedSVD, dinormalisasi L2), lalu dikelompokkan dengan spherical
+# k-means menjadi ``n_lists`` daftar (inverted file). Query hanya memeriksa
+# ``nprobe`` daftar terdekat, memilih kandidat terbaik menurut embedding,
+# lalu menghitung ulang skor cosine persisnya di matriks sparse.
+#   nprobe kecil  -> lebih cepat, recall lebih rendah
+#   nprobe besar  -> mendekati pencarian exact
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def spherical_kmeans(points, n_clusters, n_iter=10, seed=0, batch_size=65536):
+    """Centroid (ternormalisasi) dari k-means dengan similarity cosine."""
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), size=n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = assign_lists(points, centroids, batch_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+        empty = ~sums.any(axis=1)
+        # Cluster kosong diisi ulang dengan titik acak agar semua daftar terpakai
+        sums[empty] = points[rng.choice(len(points), size=empty.sum())]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def assign_lists(points, centroids, batch_size=65536):
+    labels = np.empty(len(points), dtype=np.int32)
+    for start in range(0, len(points), batch_size):
+        labels[start:start + batch_size] = np.argmax(points[start:start + batch_size] @ centroids.T, axis=1)
+    return labels
+
+
+class AnnIndex:
+    """Indeks IVF di atas embedding SVD aktor, dengan rerank exact."""
+
+    def __init__(self, components, embeddings, centroids, list_offsets, list_ids, meta=None):
+        self.components = components
+        self.embeddings = embeddings
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.meta = meta or {}
+
+    @classmethod
+    def build(cls, matrix, n_components=64, n_lists=None, sample_size=100_000,
+              n_iter=10, seed=0, version=None):
+        n_actors = matrix.shape[0]
+        n_components = max(1, min(n_components, matrix.shape[1] - 1, n_actors - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=seed)
+        embeddings = _normalize(svd.fit_transform(matrix)).astype(np.float32)
+        n_lists = n_lists or max(1, int(np.sqrt(n_actors)))
+        n_lists = min(n_lists, n_actors)
+
+        rng = np.random.default_rng(seed)
+        sample = embeddings
+        if n_actors > sample_size:
+            sample = embeddings[rng.choice(n_actors, size=sample_size, replace=False)]
+        centroids = spherical_kmeans(sample, n_lists, n_iter=n_iter, seed=seed).astype(np.float32)
+
+        labels = assign_lists(embeddings, centroids)
+        list_ids = np.argsort(labels, kind="stable").astype(np.int32)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=list_offsets[1:])
+        meta = {"version": version, "n_components": n_components, "n_lists": n_lists}
+        return cls(svd.components_.astype(np.float32), embeddings, centroids,
+                   list_offsets, list_ids, meta)
+
+    # --- Simpan / muat ---
+    def save(self, directory):
+        with staging_directory(directory, prefix=".ann-") as tmp_dir:
+            for name in ("components", "embeddings", "centroids", "list_offsets", "list_ids"):
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(self.meta, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        def load(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        return cls(load("components"), load("embeddings"), load("centroids"),
+                   load("list_offsets"), load("list_ids"), read_model_meta(directory))
+
+    # --- Query ---
+    def embed(self, vector):
+        """Embedding ternormalisasi untuk vektor TF-IDF sparse (1 x vocab)."""
+        return _normalize(np.asarray(vector @ self.components.T).reshape(1, -1))[0]
+
+    def candidates(self, query, nprobe):
+        lists = top_k_indices(self.centroids @ query, nprobe)
+        parts = [self.list_ids[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+
+    def search(self, matrix, row_id=None, vector=None, k=5, nprobe=8, rerank=10, exclude=None):
+        """Top-k (ids, skor cosine exact) untuk satu aktor atau vektor query.
+
+        ``rerank`` x k kandidat terbaik menurut embedding dihitung ulang
+        skornya dengan matriks sparse; ``exclude`` disaring dari hasil.
+        """
+        if vector is None:
+            vector = matrix[row_id]
+            query = np.asarray(self.embeddings[row_id])
+        else:
+            query = self.embed(vector)
+        cands = self.candidates(query, nprobe).astype(np.int64)
+        if exclude is not None:
+            cands = cands[~np.isin(cands, exclude)]
+        if len(cands) > rerank * k:
+            approx = np.asarray(self.embeddings[cands]) @ query
+            cands = cands[top_k_indices(approx, rerank * k)]
+        exact = (matrix[cands] @ vector.T).toarray().ravel()
+        best = top_k_indices(exact, k)
+        best = best[exact[best] > 0]
+        return cands[best], exact[best]
+
+
+# ===============================
+# PENGUKURAN RECALL
+# ===============================
+def measure_recall(recommender, k=10, nprobe=8, rerank=10, sample=200, seed=0):
+    """Recall@k ANN terhadap top-k exact, beserta latensi keduanya (ms)."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(recommender.actors), size=min(sample, len(recommender.actors)), replace=False)
+    recalls, ann_ms, exact_ms = [], [], []
+    for row_id in rows:
+        actor = recommender.actors[row_id]
+        start = time.perf_counter()
+        exact_ids, _ = recommender.top_k(actor, k, exact=True)
+        exact_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        ann_ids, _ = recommender.ann.search(recommender.matrix, row_id=row_id, k=k, nprobe=nprobe,
+                                            rerank=rerank, exclude=[row_id])
+        ann_ms.append((time.perf_counter() - start) * 1000)
+        if len(exact_ids):
+            recalls.append(len(np.intersect1d(exact_ids, ann_ids)) / len(exact_ids))
+    return {
+        "k": k,
+        "nprobe": nprobe,
+        "rerank": rerank,
+        "recall": float(np.mean(recalls)) if recalls else 1.0,
+        "ann_p50_ms": float(np.percentile(ann_ms, 50)),
+        "ann_p99_ms": float(np.percentile(ann_ms, 99)),
+        "exact_p50_ms": float(np.percentile(exact_ms, 50)),
+        "exact_p99_ms": float(np.percentile(exact_ms, 99)),
+    }
+
+
+def main(argv=None):
+    from engine import RecommendationEngine  # engine sendiri mengimpor modul ini
+
+    parser = argparse.ArgumentParser(description="Bangun indeks ANN aktor dan ukur recall-nya")
+    parser.add_argument("csv_path", nargs="?", default="actorfilms.csv")
+    parser.add_argument("--components", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=None, help="jumlah daftar IVF (default: sqrt(aktor))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--rerank", type=int, nargs="+", default=[10],
+                        help="kandidat yang diskor ulang exact, kelipatan k")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    engine = RecommendationEngine.open(args.csv_path)
+    recommender = engine.recommender
+    recommender.ann = AnnIndex.build(recommender.matrix, n_components=args.components,
+                                     n_lists=args.lists, version=engine.version)
+    with build_lock(engine.store.directory):
+        recommender.ann.save(os.path.join(engine.store.directory, ANN_DIR))
+    print(f"Indeks ANN: {recommender.ann.meta['n_lists']:,} daftar, "
+          f"{recommender.ann.meta['n_components']} dimensi")
+    for rerank in args.rerank:
+        for nprobe in args.nprobe:
+            result = measure_recall(recommender, k=args.k, nprobe=nprobe, rerank=rerank,
+                                    sample=args.sample)
+            print(f"rerank={rerank:<4} nprobe={nprobe:<4} recall@{args.k}={result['recall']:.3f}  "
+                  f"ANN p50 {result['ann_p50_ms']:.2f} ms p99 {result['ann_p99_ms']:.2f} ms  |  "
+                  f"exact p50 {result['exact_p50_ms']:.2f} ms p99 {result['exact_p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import logging
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cache import ResultCache
+from engine import FILTER_KEYS, REFRESH_INTERVAL, EngineHolder
+from metrics import cache_gauges, metrics
+
+logger = logging.getLogger("rekomendasi.api")
+
+MAX_K = 100
+# top_k_batch memproses aktor per blok (recommender.BATCH_BLOCK_SIZE), jadi
+# memori tetap; batas ini menjaga latensi satu request (~2 s untuk 1000
+# aktor pada 3 juta baris)
+MAX_BATCH = 1000
+
+
+# ===============================
+# HTTP API REKOMENDASI (JSON)
+# ===============================
+#   GET  /health                           status & versi dataset (503 selama warm-up)
+#   GET  /metrics                          metrik format teks Prometheus
+#   GET  /recommend?actor=...&k=5&n=10      rekomendasi satu aktor
+#   POST /recommend/batch                  {"actors": [...], "k": 5, "n": 10}
+#   POST /recommend/profile                {"actors": {"A": 2, "B": 1}, "k": 5, "n": 10,
+#                                           "exclude_films": [...]}
+# Filter film opsional: year_min, year_max, min_rating, min_votes (parameter
+# query untuk GET, objek "filters" di body untuk POST).
+class BadRequest(Exception):
+    pass
+
+
+def _int_param(value, default, upper):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise BadRequest(f"parameter harus bilangan bulat: {value!r}")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"parameter harus bilangan bulat: {value!r}")
+    if not 1 <= number <= upper:
+        raise BadRequest(f"parameter harus di antara 1 dan {upper}")
+    return number
+
+
+def _filter_params(source):
+    filters = {}
+    for name in FILTER_KEYS:
+        value = source.get(name)
+        if value is None or value == "":
+            continue
+        if isinstance(value, bool):
+            raise BadRequest(f"filter {name} harus berupa angka")
+        try:
+            number = float(value) if name == "min_rating" else int(value)
+        except (TypeError, ValueError, OverflowError):
+            raise BadRequest(f"filter {name} harus berupa angka: {value!r}")
+        if not math.isfinite(number):
+            raise BadRequest(f"filter {name} harus berupa angka terhingga")
+        if number < 0:
+            raise BadRequest(f"filter {name} tidak boleh negatif")
+        filters[name] = number
+    if filters.get("year_min", 0) > filters.get("year_max", float("inf")):
+        raise BadRequest("year_min tidak boleh lebih besar dari year_max")
+    return filters
+
+
+def _body_filters(body):
+    filters = body.get("filters") or {}
+    if not isinstance(filters, dict):
+        raise BadRequest("'filters' harus berupa objek")
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise BadRequest(f"filter tidak dikenal: {', '.join(sorted(unknown))}")
+    return _filter_params(filters)
+
+
+class NotReady(Exception):
+    pass
+
+
+def make_handler(holder):
+    """Handler HTTP di atas EngineHolder; engine dibaca sekali per request
+    sehingga pergantian versi di latar belakang tidak memotong request."""
+
+    def current_engine():
+        engine = holder.engine
+        if engine is None:
+            raise NotReady()
+        return engine
+
+    class RecommendationHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if url.path == "/health":
+                status = holder.status()
+                status.update(status="ok" if status["ready"] else "starting",
+                              cache=holder.cache.stats())
+                self._send(200 if status["ready"] else 503, status)
+            elif url.path == "/metrics":
+                self._send_text(200, metrics.render_prometheus(cache_gauges(holder.cache)))
+            elif url.path == "/recommend":
+                self._handle("api_recommend", lambda: self._recommend(query))
+            else:
+                self._send(404, {"error": "endpoint tidak ditemukan"})
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if path == "/recommend/batch":
+                self._handle("api_recommend_batch", self._recommend_batch)
+            elif path == "/recommend/profile":
+                self._handle("api_recommend_profile", self._recommend_profile)
+            else:
+                self._send(404, {"error": "endpoint tidak ditemukan"})
+
+        def _recommend(self, query):
+            actor = query.get("actor")
+            if not actor:
+                raise BadRequest("parameter 'actor' wajib diisi")
+            k = _int_param(query.get("k"), 5, MAX_K)
+            n_films = _int_param(query.get("n"), 10, MAX_K)
+            filters = _filter_params(query)
+            engine = current_engine()
+            if actor not in engine:
+                return 404, {"actor": actor, "error": "aktor tidak ditemukan"}
+            return 200, engine.recommend(actor, k, n_films, filters)
+
+        def _json_body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                raise BadRequest("body harus JSON")
+            if not isinstance(body, dict):
+                raise BadRequest("body harus objek JSON")
+            return body
+
+        def _recommend_batch(self):
+            body = self._json_body()
+            actors = body.get("actors")
+            if not isinstance(actors, list) or not all(isinstance(a, str) for a in actors):
+                raise BadRequest("'actors' harus berupa list nama aktor")
+            if len(actors) > MAX_BATCH:
+                raise BadRequest(f"maksimal {MAX_BATCH} aktor per batch")
+            k = _int_param(body.get("k"), 5, MAX_K)
+            n_films = _int_param(body.get("n"), 10, MAX_K)
+            filters = _body_filters(body)
+            engine = current_engine()
+            return 200, {"version": engine.version,
+                         "results": engine.recommend_batch(actors, k, n_films, filters)}
+
+        def _recommend_profile(self):
+            body = self._json_body()
+            weights = body.get("actors")
+            if not isinstance(weights, dict) or not weights:
+                raise BadRequest("'actors' harus objek {nama aktor: bobot}")
+            if len(weights) > MAX_K:
+                raise BadRequest(f"maksimal {MAX_K} aktor per profil")
+            if not all(isinstance(w, (int, float)) and not isinstance(w, bool)
+                       and math.isfinite(w) and w > 0 for w in weights.values()):
+                raise BadRequest("bobot aktor harus bilangan positif yang terhingga")
+            exclude_films = body.get("exclude_films") or []
+            if not isinstance(exclude_films, list) or not all(isinstance(f, str) for f in exclude_films):
+                raise BadRequest("'exclude_films' harus berupa list judul film")
+            k = _int_param(body.get("k"), 5, MAX_K)
+            n_films = _int_param(body.get("n"), 10, MAX_K)
+            filters = _body_filters(body)
+            engine = current_engine()
+            if not any(actor in engine for actor in weights):
+                return 404, {"error": "tidak ada aktor profil yang ditemukan"}
+            return 200, engine.recommend_profile_payload(weights, k, n_films, exclude_films, filters)
+
+        def _handle(self, span, action):
+            with metrics.span(span):
+                try:
+                    status, payload = action()
+                except BadRequest as e:
+                    status, payload = 400, {"error": str(e)}
+                except NotReady:
+                    status, payload = 503, {"error": "data & model sedang dimuat, coba lagi"}
+                except Exception:
+                    # Tetap jawab dengan JSON (dan tercatat di metrik), bukan menutup koneksi
+                    logger.exception("error saat memproses %s %s", self.command, self.path)
+                    status, payload = 500, {"error": "kesalahan internal server"}
+                metrics.inc("http_responses", status=status)
+                self._send(status, payload)
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self._send_body(status, body, "application/json; charset=utf-8")
+
+        def _send_text(self, status, text):
+            self._send_body(status, text.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+
+        def _send_body(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return RecommendationHandler
+
+
+def make_server(holder, host="127.0.0.1", port=8000):
+    return ThreadingHTTPServer((host, port), make_handler(holder))
+
+
+def _weight_arg(text):
+    name, _, value = text.partition("=")
+    try:
+        return name.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"format NAMA=BOBOT, misalnya rating=0.3: {text!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API rekomendasi film")
+    parser.add_argument("--csv", default="actorfilms.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-entries", type=int, default=1024)
+    parser.add_argument("--cache-mb", type=int, default=64)
+    parser.add_argument("--ann-nprobe", type=int, default=None,
+                        help="pakai indeks ANN dengan nprobe ini (default: exact)")
+    parser.add_argument("--ann-rerank", type=int, default=None,
+                        help="kandidat ANN yang diskor ulang exact, kelipatan k (default: 10)")
+    parser.add_argument("--refresh-seconds", type=float, default=REFRESH_INTERVAL,
+                        help="jeda pemeriksaan versi dataset baru (default: 60)")
+    parser.add_argument("--ranking-weight", type=_weight_arg, action="append", default=[],
+                        metavar="NAMA=BOBOT",
+                        help="timpa satu bobot skor film (similarity, rating, votes); boleh diulang")
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(max_entries=args.cache_entries, max_bytes=args.cache_mb * 1024 * 1024)
+    # Store & model dimuat di thread latar; /health 503 sampai siap
+    try:
+        holder = EngineHolder(args.csv, cache=cache, ann_nprobe=args.ann_nprobe, ann_rerank=args.ann_rerank,
+                              ranking_weights=dict(args.ranking_weight),
+                              refresh_interval=args.refresh_seconds)
+    except ValueError as e:
+        parser.error(str(e))
+    holder.start()
+    server = make_server(holder, args.host, args.port)
+    print(f"API rekomendasi di http://{args.host}:{args.port} (memuat data & model...)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        holder.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
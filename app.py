@@ -1,8 +1,14 @@
-import streamlit as st
+import logging
+import time
+
+import numpy as np
 import pandas as pd
+import streamlit as st
 import plotly.express as px
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
+
+from cache import ResultCache
+from engine import EngineHolder
+from metrics import memory_usage, metrics
 
 # ===============================
 # KONFIGURASI HALAMAN
@@ -12,6 +18,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# Durasi setiap tahap rerun ini dicatat ke kolektor metrik (metrics.py)
+metrics.start_trace()
+
 # ===============================
 # STYLING (CSS) DENGAN BOOTSTRAP ICONS
 # ===============================
@@ -67,14 +76,88 @@ footer {
 # ===============================
 # LOAD DATASET
 # ===============================
-@st.cache_data
-def load_data():
-    df = pd.read_csv("actorfilms.csv")
-    df.dropna(subset=["Actor", "Film", "Rating"], inplace=True)
-    df["Rating"] = df["Rating"].astype(float)
-    return df
+DATA_PATH = "actorfilms.csv"
+RESULT_CACHE_MAX_ENTRIES = 1024
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Indeks ANN untuk katalog sangat besar (None = pencarian exact). ANN_RERANK
+# x k kandidat diskor ulang exact (None = default model, 10); nprobe hanya
+# menambah recall bila rerank cukup besar. Ukur dulu trade-off
+# recall/latensi dengan: python ann.py actorfilms.csv
+ANN_NPROBE = None
+ANN_RERANK = None
+# Bobot skor film yang menimpa engine.RANKING_WEIGHTS, misalnya {"rating": 0.3}
+RANKING_WEIGHTS = None
+# Panel debug performa di sidebar (juga bisa lewat URL ?debug=1) dan satu
+# baris log per rerun di logger "rekomendasi.perf"
+DEBUG_PANEL = False
+PERF_LOG = True
+
+# Logger baris performa per rerun; handler dipasang sekali per proses
+@st.cache_resource
+def perf_logger():
+    logger = logging.getLogger("rekomendasi.perf")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+# Cache hasil rekomendasi per aktor, dibagi semua sesi dalam satu proses
+@st.cache_resource
+def load_result_cache():
+    return ResultCache(max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES)
+
+# Store kolumnar (memory mapping) dan model TF-IDF dimuat oleh thread latar
+# sekali per proses. Versi dataset baru (hash isi actorfilms.csv) dibangun di
+# latar lalu ditukar tanpa menahan rerun; setiap rerun memakai satu engine.
+@st.cache_resource
+def load_engine_holder():
+    return EngineHolder(DATA_PATH, cache=load_result_cache(), ann_nprobe=ANN_NPROBE,
+                        ann_rerank=ANN_RERANK, ranking_weights=RANKING_WEIGHTS).start()
+
+with metrics.span("app.load_engine"):
+    engine_holder = load_engine_holder()
+    if not engine_holder.ready():
+        with st.spinner("Menyiapkan data dan model rekomendasi..."):
+            while not engine_holder.wait(timeout=1):
+                if engine_holder.error:
+                    st.error(f"Gagal memuat data: {engine_holder.error}")
+                    st.stop()
+    engine = engine_holder.engine
+store = engine.store
 
-df = load_data()
+# ===============================
+# KOMPONEN: PICKER NAMA & TABEL BERHALAMAN
+# ===============================
+# Hanya potongan yang terlihat yang dikirim ke browser setiap rerun
+PICKER_LIMIT = 50
+TABLE_PAGE_SIZE = 100
+
+def name_picker(label, search, key, placeholder, index=0, label_visibility="visible"):
+    query = st.text_input(label, key=f"{key}_query", placeholder=placeholder,
+                          label_visibility=label_visibility)
+    options, total = search(query.strip(), PICKER_LIMIT)
+    if not options:
+        st.caption("Tidak ada nama yang cocok")
+        return None
+    if total > len(options):
+        st.caption(f"Menampilkan {len(options)} dari {total:,} nama — ketik lebih lengkap untuk mempersempit")
+    return st.selectbox(label, options, index=index, key=key, placeholder=placeholder,
+                        label_visibility="collapsed")
+
+def paged_dataframe(fetch, total, key):
+    n_pages = max(1, -(-total // TABLE_PAGE_SIZE))
+    page = st.number_input(f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages,
+                           value=1, step=1, key=f"{key}_page")
+    start = (page - 1) * TABLE_PAGE_SIZE
+    stop = min(start + TABLE_PAGE_SIZE, total)
+    with metrics.span(f"app.{key}"):
+        data = fetch(slice(start, stop))
+    data.index = range(start, stop)
+    st.dataframe(data, use_container_width=True)
+    st.caption(f"Baris {start + 1:,}–{stop:,} dari {total:,}")
 
 # ===============================
 # NAVBAR DI SEBELAH KIRI
@@ -99,6 +182,7 @@ for idx, option in enumerate(menu_options):
         st.rerun()
 
 selected_menu = st.session_state["menu_selected"]
+page_start = time.perf_counter()
 
 # ===============================
 # HALAMAN 1 — BIODATA KELOMPOK
@@ -213,52 +297,102 @@ elif selected_menu == "🔍 Cari Rekomendasi Film":
     st.markdown('<h1><i class="bi bi-search header-icon"></i> Cari Rekomendasi Film</h1>', unsafe_allow_html=True)
     st.markdown('<p>Temukan film serupa berdasarkan aktor favoritmu <i class="bi bi-person-circle"></i></p>', unsafe_allow_html=True)
 
-    actor_list = sorted(df["Actor"].unique().tolist())
-    
-    # Perbaikan: menggunakan markdown untuk label dengan icon
-    st.markdown('<p><i class="bi bi-search"></i> Pilih atau ketik nama aktor:</p>', unsafe_allow_html=True)
-    selected_actor = st.selectbox(
-        "Pilih aktor:",
-        actor_list,
-        index=None,
-        placeholder="Ketik nama aktor...",
-        label_visibility="collapsed"  # Sembunyikan label default
-    )
+    recommend_modes = ["👤 Satu Aktor", "👥 Gabungan Beberapa Aktor"]
+    recommend_mode = st.radio("Mode rekomendasi:", recommend_modes, horizontal=True, key="recommend_mode")
+    similar_actors = recommended_films = None
+
+    # --- Filter film: dievaluasi pada baris kandidat saat film dipilih ---
+    first_year, last_year = store.stats.summary["first_year"], store.stats.summary["latest_year"]
+    with st.expander("🎚️ Filter Film"):
+        year_range = (first_year, last_year)
+        if first_year < last_year:
+            year_range = st.slider("Tahun rilis", first_year, last_year, year_range, key="filter_year")
+        min_rating = st.slider("Rating minimal", 0.0, 10.0, 0.0, 0.5, key="filter_min_rating")
+        min_votes = st.number_input("Votes minimal", min_value=0, value=0, step=10000, key="filter_min_votes")
+    film_filters = {
+        "year_min": year_range[0] if year_range[0] > first_year else None,
+        "year_max": year_range[1] if year_range[1] < last_year else None,
+        "min_rating": min_rating or None,
+        "min_votes": int(min_votes) or None,
+    }
+
+    if recommend_mode == recommend_modes[0]:
+        # Perbaikan: menggunakan markdown untuk label dengan icon
+        st.markdown('<p><i class="bi bi-search"></i> Pilih atau ketik nama aktor:</p>', unsafe_allow_html=True)
+        selected_actor = name_picker(
+            "Pilih aktor:",
+            store.search_actors,
+            key="recommend_actor",
+            placeholder="Ketik nama aktor...",
+            index=None,
+            label_visibility="collapsed"  # Sembunyikan label default
+        )
 
-    if selected_actor:
-        # --- Filmografi ---
-        actor_films = df[df["Actor"] == selected_actor]["Film"].tolist()
-        st.markdown(f'### <i class="bi bi-collection-play"></i> Filmografi {selected_actor}', unsafe_allow_html=True)
+        if selected_actor:
+            # --- Filmografi ---
+            with metrics.span("app.filmography"):
+                actor_films = store.frame(store.actor_rows(selected_actor), ["Film"])["Film"].tolist()
+            st.markdown(f'### <i class="bi bi-collection-play"></i> Filmografi {selected_actor}', unsafe_allow_html=True)
         
-        if actor_films:
-            films_display = "\n".join([f"- <i class='bi bi-film'></i> {film}" for film in actor_films[:15]])
-            st.markdown(f'<div class="section">{films_display}</div>', unsafe_allow_html=True)
+            if actor_films:
+                films_display = "\n".join([f"- <i class='bi bi-film'></i> {film}" for film in actor_films[:15]])
+                st.markdown(f'<div class="section">{films_display}</div>', unsafe_allow_html=True)
             
-            if len(actor_films) > 15:
-                st.markdown(f"""
-                <div style="background-color: #d1ecf1; color: #0c5460; padding: 10px; border-radius: 5px; border: 1px solid #bee5eb;">
-                <i class="bi bi-info-circle"></i> Menampilkan 15 dari {len(actor_films)} film
+                if len(actor_films) > 15:
+                    st.markdown(f"""
+                    <div style="background-color: #d1ecf1; color: #0c5460; padding: 10px; border-radius: 5px; border: 1px solid #bee5eb;">
+                    <i class="bi bi-info-circle"></i> Menampilkan 15 dari {len(actor_films)} film
+                    </div>
+                    """, unsafe_allow_html=True)
+            else:
+                st.markdown("""
+                <div style="background-color: #fff3cd; color: #856404; padding: 10px; border-radius: 5px; border: 1px solid #ffeaa7;">
+                <i class="bi bi-exclamation-triangle"></i> Tidak ada data film untuk aktor ini
                 </div>
                 """, unsafe_allow_html=True)
-        else:
-            st.markdown("""
-            <div style="background-color: #fff3cd; color: #856404; padding: 10px; border-radius: 5px; border: 1px solid #ffeaa7;">
-            <i class="bi bi-exclamation-triangle"></i> Tidak ada data film untuk aktor ini
-            </div>
-            """, unsafe_allow_html=True)
 
-        # --- Similarity antar aktor ---
-        st.markdown('### <i class="bi bi-cpu"></i> Menghitung Rekomendasi...', unsafe_allow_html=True)
+            # --- Similarity antar aktor ---
+            st.markdown('### <i class="bi bi-cpu"></i> Menghitung Rekomendasi...', unsafe_allow_html=True)
         
-        with st.spinner('Menganalisis filmografi dan mencari aktor serupa...'):
-            actor_group = df.groupby("Actor")["Film"].apply(lambda x: " ".join(x)).reset_index()
-            tfidf = TfidfVectorizer(stop_words="english")
-            tfidf_matrix = tfidf.fit_transform(actor_group["Film"])
-            similarity = cosine_similarity(tfidf_matrix, tfidf_matrix)
-            sim_df = pd.DataFrame(similarity, index=actor_group["Actor"], columns=actor_group["Actor"])
+            with st.spinner('Menganalisis filmografi dan mencari aktor serupa...'), metrics.span("app.recommend_result"):
+                similar_actors, recommended_films = engine.recommend_result(selected_actor, k=5, n_films=10, filters=film_filters)
 
-            similar_actors = sim_df[selected_actor].sort_values(ascending=False)[1:6]
+    else:
+        # --- Profil: beberapa aktor berbobot, dihitung dalam satu perkalian ---
+        st.markdown('<p><i class="bi bi-people"></i> Tambahkan beberapa aktor lalu atur bobotnya:</p>', unsafe_allow_html=True)
+        profile = st.session_state.setdefault("profile_actors", {})
+        candidate = name_picker(
+            "Tambah aktor ke profil:",
+            store.search_actors,
+            key="profile_actor",
+            placeholder="Ketik nama aktor...",
+            index=None,
+            label_visibility="collapsed"
+        )
+        if candidate and st.button("Tambah ke profil", key="profile_add"):
+            profile.setdefault(candidate, 1.0)
 
+        for actor in list(profile):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                profile[actor] = st.slider(actor, 0.5, 3.0, profile[actor], 0.5, key=f"profile_weight_{actor}")
+            with col2:
+                if st.button("Hapus", key=f"profile_remove_{actor}"):
+                    del profile[actor]
+                    st.rerun()
+
+        exclude_seen = st.checkbox("Sembunyikan film yang sudah dibintangi aktor profil", value=True,
+                                   key="profile_exclude_seen")
+        if profile:
+            exclude_films = None
+            if exclude_seen:
+                seen_codes = np.unique(store.film_codes[store.actors_rows(list(profile))])
+                exclude_films = store.film_names.take(seen_codes).tolist()
+            with st.spinner('Menggabungkan profil aktor dan mencari aktor serupa...'), metrics.span("app.recommend_profile"):
+                similar_actors, recommended_films = engine.recommend_profile(
+                    profile, k=5, n_films=10, exclude_films=exclude_films, filters=film_filters)
+
+    if similar_actors is not None:
         # --- Aktor Serupa ---
         st.markdown('### <i class="bi bi-people-fill"></i> Aktor dengan Filmografi Serupa', unsafe_allow_html=True)
         
@@ -278,25 +412,19 @@ elif selected_menu == "🔍 Cari Rekomendasi Film":
         # --- Rekomendasi Film ---
         st.markdown('### <i class="bi bi-ticket-perforated"></i> Rekomendasi Film dari Aktor Serupa', unsafe_allow_html=True)
         
-        similar_actors_list = similar_actors.index.tolist()
-        recommended_films = (
-            df[df["Actor"].isin(similar_actors_list)]
-            .sort_values(by="Rating", ascending=False)
-            .drop_duplicates(subset=["Film"])
-            .head(10)
-        )
-
         if not recommended_films.empty:
             # Format dataframe dengan styling
-            styled_films = recommended_films[["Film", "Actor", "Year", "Rating", "Votes"]].copy()
+            styled_films = recommended_films.copy()
             styled_films["Rating"] = styled_films["Rating"].round(2)
             
             # Tampilkan dengan container yang lebih menarik
+            render_start = time.perf_counter()
             for _, film in styled_films.iterrows():
                 with st.container():
                     col1, col2, col3 = st.columns([3, 2, 1])
                     with col1:
-                        st.markdown(f"**<i class='bi bi-film'></i> {film['Film']}** ({film['Year']})", unsafe_allow_html=True)
+                        year = "" if pd.isna(film['Year']) else f" ({film['Year']})"
+                        st.markdown(f"**<i class='bi bi-film'></i> {film['Film']}**{year}", unsafe_allow_html=True)
                         st.markdown(f"<small><i class='bi bi-person'></i> {film['Actor']}</small>", unsafe_allow_html=True)
                     with col2:
                         st.markdown(f"<i class='bi bi-star-fill'></i> **{film['Rating']}**/10", unsafe_allow_html=True)
@@ -309,6 +437,7 @@ elif selected_menu == "🔍 Cari Rekomendasi Film":
                         else:
                             st.markdown('<span style="color: blue;"><i class="bi bi-film"></i> Watch</span>', unsafe_allow_html=True)
                     st.divider()
+            metrics.observe("app.render_films", time.perf_counter() - render_start)
         else:
             st.markdown("""
             <div style="background-color: #fff3cd; color: #856404; padding: 10px; border-radius: 5px; border: 1px solid #ffeaa7;">
@@ -320,7 +449,7 @@ elif selected_menu == "🔍 Cari Rekomendasi Film":
         # Perbaikan: tidak menggunakan unsafe_allow_html untuk st.info
         st.markdown("""
         <div style="background-color: #d1ecf1; color: #0c5460; padding: 12px; border-radius: 8px; border: 1px solid #bee5eb;">
-        <i class="bi bi-info-circle"></i> Silakan pilih aktor terlebih dahulu untuk melihat rekomendasi film.
+        <i class="bi bi-info-circle"></i> Silakan pilih aktor (atau tambahkan aktor ke profil) terlebih dahulu untuk melihat rekomendasi film.
         </div>
         """, unsafe_allow_html=True)
 
@@ -333,6 +462,10 @@ elif selected_menu == "📊 Dataset & Visualisasi":
     # Perbaikan: menggunakan emoji untuk tab karena Streamlit tidak mendukung HTML di tab
     tab1, tab2 = st.tabs(["🎬 Data Film", "👤 Data Aktor"])
 
+    # Semua agregat sudah dihitung saat ingest (stats.py)
+    stats = store.stats
+    summary = stats.summary
+
     # --- TAB 1: Data Film ---
     with tab1:
         st.markdown('<h3><i class="bi bi-film"></i> Data Film</h3>', unsafe_allow_html=True)
@@ -340,31 +473,29 @@ elif selected_menu == "📊 Dataset & Visualisasi":
         # Statistik singkat
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            total_films = df["Film"].nunique()
-            st.metric("Total Film", f"{total_films:,}")
+            st.metric("Total Film", f"{summary['total_films']:,}")
         with col2:
-            avg_rating = df["Rating"].mean()
-            st.metric("Rata-rata Rating", f"{avg_rating:.2f}")
+            st.metric("Rata-rata Rating", f"{summary['avg_rating']:.2f}")
         with col3:
-            latest_year = df["Year"].max()
-            st.metric("Tahun Terbaru", latest_year)
+            st.metric("Tahun Terbaru", summary["latest_year"])
         with col4:
-            top_rating = df["Rating"].max()
-            st.metric("Rating Tertinggi", f"{top_rating:.1f}")
+            st.metric("Rating Tertinggi", f"{summary['top_rating']:.1f}")
 
-        film_data = df[["Film", "Year", "Rating", "Votes"]].drop_duplicates()
-        st.dataframe(film_data, use_container_width=True)
+        paged_dataframe(stats.film_table, stats.film_table_size(), key="film_table")
 
         # Visualisasi
         col1, col2 = st.columns(2)
         
         with col1:
-            # Grafik distribusi rating (berdasarkan film unik)
-            fig = px.histogram(film_data, x="Rating", nbins=20, 
-                             title="Distribusi Rating Film",
-                             color_discrete_sequence=["#2b2d42"])
+            # Grafik distribusi rating (berdasarkan film unik, bin dihitung saat ingest)
+            rating_hist = stats.rating_histogram()
+            fig = px.bar(rating_hist, x="Rating", y="Banyak Film",
+                         title="Distribusi Rating Film",
+                         hover_data=["Dari", "Sampai"],
+                         color_discrete_sequence=["#2b2d42"])
             fig.update_layout(
                 showlegend=False,
+                bargap=0,
                 yaxis_title="Banyak Film",
                 xaxis_title="Rating"
             )
@@ -377,7 +508,7 @@ elif selected_menu == "📊 Dataset & Visualisasi":
 
         with col2:
             # Grafik jumlah film per tahun
-            yearly_counts = film_data.groupby("Year").size().reset_index(name="Jumlah Film")
+            yearly_counts = stats.yearly_counts()
             fig2 = px.bar(yearly_counts, x="Year", y="Jumlah Film", 
                          title="Jumlah Film per Tahun",
                          color_discrete_sequence=["#ef233c"])
@@ -390,7 +521,7 @@ elif selected_menu == "📊 Dataset & Visualisasi":
 
         # Film dengan rating tertinggi
         st.markdown('<h4><i class="bi bi-trophy"></i> Film dengan Rating Tertinggi</h4>', unsafe_allow_html=True)
-        top_films = film_data.sort_values(by="Rating", ascending=False).head(10)
+        top_films = stats.top_films()
         fig3 = px.bar(top_films, x="Rating", y="Film", orientation="h",
                      title="Top 10 Film dengan Rating Tertinggi", 
                      color="Rating", color_continuous_scale="Viridis")
@@ -399,9 +530,11 @@ elif selected_menu == "📊 Dataset & Visualisasi":
         # Detail film
         st.markdown("---")
         st.markdown('<h4><i class="bi bi-zoom-in"></i> Lihat Detail Film</h4>', unsafe_allow_html=True)
-        selected_film = st.selectbox("Pilih film untuk melihat aktor yang berperan:", sorted(df["Film"].unique()), key="film_select")
+        selected_film = name_picker("Pilih film untuk melihat aktor yang berperan:", store.search_films,
+                                    key="film_select", placeholder="Ketik judul film...")
         if selected_film:
-            film_detail = df[df["Film"] == selected_film][["Actor", "Rating"]].sort_values(by="Rating", ascending=False)
+            with metrics.span("app.film_detail"):
+                film_detail = store.frame(store.film_rows(selected_film), ["Actor", "Rating"]).sort_values(by="Rating", ascending=False)
             st.markdown(f'### <i class="bi bi-film"></i> {selected_film}', unsafe_allow_html=True)
             st.dataframe(film_detail, use_container_width=True)
 
@@ -409,36 +542,23 @@ elif selected_menu == "📊 Dataset & Visualisasi":
     with tab2:
         st.markdown('<h3><i class="bi bi-person-badge"></i> Data Aktor</h3>', unsafe_allow_html=True)
         
-        actor_summary = df.groupby("Actor").agg({
-            "Film": "count",
-            "Rating": "mean",
-            "Votes": "sum"
-        }).rename(columns={
-            "Film": "Jumlah Film", 
-            "Rating": "Rata-rata Rating", 
-            "Votes": "Total Votes"
-        }).reset_index()
-
         # Statistik aktor
         col1, col2, col3 = st.columns(3)
         with col1:
-            total_actors = len(actor_summary)
-            st.metric("Total Aktor", f"{total_actors:,}")
+            st.metric("Total Aktor", f"{summary['total_actors']:,}")
         with col2:
-            avg_films_per_actor = actor_summary["Jumlah Film"].mean()
-            st.metric("Rata-rata Film per Aktor", f"{avg_films_per_actor:.1f}")
+            st.metric("Rata-rata Film per Aktor", f"{summary['avg_films_per_actor']:.1f}")
         with col3:
-            top_actor_rating = actor_summary["Rata-rata Rating"].max()
-            st.metric("Rating Aktor Tertinggi", f"{top_actor_rating:.2f}")
+            st.metric("Rating Aktor Tertinggi", f"{summary['top_actor_rating']:.2f}")
 
-        st.dataframe(actor_summary, use_container_width=True)
+        paged_dataframe(stats.actor_summary, stats.actor_summary_size(), key="actor_summary")
 
         # Visualisasi aktor
         col1, col2 = st.columns(2)
         
         with col1:
             # Top 10 aktor dengan rating tertinggi
-            top_actors = actor_summary.nlargest(10, "Rata-rata Rating")
+            top_actors = stats.top_actors_by_rating()
             fig4 = px.bar(top_actors, x="Rata-rata Rating", y="Actor", orientation="h",
                          title="Top 10 Aktor dengan Rating Tertinggi",
                          color="Rata-rata Rating", color_continuous_scale="RdBu")
@@ -446,7 +566,7 @@ elif selected_menu == "📊 Dataset & Visualisasi":
 
         with col2:
             # Top 10 aktor dengan film terbanyak
-            prolific_actors = actor_summary.nlargest(10, "Jumlah Film")
+            prolific_actors = stats.top_actors_by_films()
             fig5 = px.bar(prolific_actors, x="Jumlah Film", y="Actor", orientation="h",
                          title="Top 10 Aktor dengan Film Terbanyak",
                          color="Jumlah Film", color_continuous_scale="Blues")
@@ -455,9 +575,11 @@ elif selected_menu == "📊 Dataset & Visualisasi":
         # Detail aktor
         st.markdown("---")
         st.markdown('<h4><i class="bi bi-zoom-in"></i> Lihat Detail Aktor</h4>', unsafe_allow_html=True)
-        selected_actor = st.selectbox("Pilih nama aktor untuk melihat film yang dibintanginya:", sorted(df["Actor"].unique()), key="actor_select")
+        selected_actor = name_picker("Pilih nama aktor untuk melihat film yang dibintanginya:", store.search_actors,
+                                     key="actor_select", placeholder="Ketik nama aktor...")
         if selected_actor:
-            actor_detail = df[df["Actor"] == selected_actor][["Film", "Year", "Rating"]].drop_duplicates()
+            with metrics.span("app.actor_detail"):
+                actor_detail = store.frame(store.actor_rows(selected_actor), ["Film", "Year", "Rating"]).drop_duplicates()
             st.markdown(f'### <i class="bi bi-person-circle"></i> {selected_actor}', unsafe_allow_html=True)
             
             # Statistik aktor
@@ -467,10 +589,29 @@ elif selected_menu == "📊 Dataset & Visualisasi":
             with col2:
                 st.metric("Rating Rata-rata", f"{actor_detail['Rating'].mean():.2f}")
             with col3:
-                st.metric("Film Terbaru", int(actor_detail['Year'].max()))
+                latest = actor_detail['Year'].max()
+                st.metric("Film Terbaru", "-" if pd.isna(latest) else int(latest))
             
             st.dataframe(actor_detail, use_container_width=True)
 
+PAGE_SPANS = dict(zip(menu_options, ["biodata", "tentang", "rekomendasi", "visualisasi"]))
+metrics.observe(f"app.page.{PAGE_SPANS[selected_menu]}", time.perf_counter() - page_start)
+
+# ===============================
+# STATISTIK CACHE (SIDEBAR)
+# ===============================
+# Dirender setelah halaman agar angka sudah mencakup rerun ini
+with st.sidebar.expander("Cache Rekomendasi"):
+    cache_stats = engine.cache.stats()
+    st.caption(
+        f"Entri: {cache_stats['entries']:,}/{cache_stats['max_entries']:,} · "
+        f"Ukuran: {cache_stats['bytes'] / 1024:,.0f}/{cache_stats['max_bytes'] / 1024:,.0f} KB"
+    )
+    st.caption(
+        f"Hit: {cache_stats['hits']:,} · Miss: {cache_stats['misses']:,} · "
+        f"Eviction: {cache_stats['evictions']:,} · Hit rate: {cache_stats['hit_rate']:.0%}"
+    )
+
 # ===============================
 # FOOTER
 # ===============================
@@ -480,4 +621,39 @@ st.markdown("""
 <i class="bi bi-heart-fill" style="color: red;"></i> Dibuat dengan cinta oleh <b>Kelompok Kinder Joy</b> — Sistem Pemberi Rekomendasi 2025
 <br><small><i class="bi bi-github"></i> Repository tersedia di GitHub</small>
 </footer>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ===============================
+# PANEL DEBUG & LOG PERFORMA
+# ===============================
+rerun_seconds, rerun_spans = metrics.end_trace()
+
+if DEBUG_PANEL or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("Debug Performa", expanded=True):
+        memory = memory_usage()
+        st.caption(
+            f"Rerun: {rerun_seconds * 1000:,.1f} ms · "
+            f"RSS: {memory.get('process_resident_memory_bytes', 0) / 2**20:,.0f} MB · "
+            f"Puncak: {memory.get('process_peak_resident_memory_bytes', 0) / 2**20:,.0f} MB"
+        )
+        st.dataframe(
+            [{"Span": name, "ms": round(seconds * 1000, 2)} for name, seconds in rerun_spans],
+            use_container_width=True, hide_index=True,
+        )
+        st.caption("Kumulatif proses")
+        st.dataframe(
+            [
+                {"Span": name, "n": span["count"], "rata-rata ms": round(span["mean_s"] * 1000, 2),
+                 "maks ms": round(span["max_s"] * 1000, 2)}
+                for name, span in sorted(metrics.snapshot()["spans"].items())
+            ],
+            use_container_width=True, hide_index=True,
+        )
+
+if PERF_LOG:
+    perf_logger().info(
+        "rerun page=%s total_ms=%.1f %s cache_hits=%d cache_misses=%d",
+        PAGE_SPANS[selected_menu], rerun_seconds * 1000,
+        " ".join(f"{name}_ms={seconds * 1000:.1f}" for name, seconds in rerun_spans),
+        cache_stats["hits"], cache_stats["misses"],
+    )
@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from datastore import DataStore, build_store
+from engine import RecommendationEngine
+from recommender import ActorRecommender
+from stats import build_stats
+
+# ===============================
+# DATASET SINTETIS
+# ===============================
+WORDS = (
+    "love night dark king war story man woman city star last day life dead blood "
+    "road home girl boy secret world red blue fire ice house lost time dream game"
+).split()
+DEFAULT_SIZES = ["10000:1000", "100000:10000", "1000000:100000"]
+
+
+def parse_size(text):
+    rows, actors = (int(float(part)) for part in text.split(":"))
+    return rows, actors
+
+
+def generate_dataset(path, rows, actors, seed=0, chunk_rows=1_000_000):
+    """Tulis actorfilms.csv sintetis dengan kolom yang sama seperti dataset asli.
+
+    Jumlah film per aktor dan popularitas film mengikuti distribusi miring
+    (Zipf) agar mirip data IMDb; judul film tersusun dari kosakata kecil
+    sehingga TF-IDF punya term bersama.
+    """
+    rng = np.random.default_rng(seed)
+    n_films = max(rows // 5, 1)
+    title_words = rng.integers(0, len(WORDS), size=(n_films, 3))
+    title_len = rng.integers(1, 4, size=n_films)
+    titles = np.array([
+        " ".join(WORDS[w] for w in title_words[i, :title_len[i]]).title() + f" {i}"
+        for i in range(n_films)
+    ], dtype=object)
+    film_year = rng.integers(1920, 2024, size=n_films)
+    film_votes = rng.zipf(1.5, size=n_films).clip(max=3_000_000) * 100
+    film_rating = np.round(rng.normal(6.3, 1.1, size=n_films).clip(1, 10), 1)
+
+    with open(path, "w", newline="") as f:
+        f.write("Actor,ActorID,Film,Year,Votes,Rating,FilmID\n")
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            actor = (rng.zipf(1.3, size=size) - 1) % actors
+            film = (rng.zipf(1.2, size=size) - 1 + rng.integers(0, n_films, size=size) // 2) % n_films
+            pd.DataFrame({
+                "Actor": [f"Actor {a}" for a in actor],
+                "ActorID": [f"nm{a:07d}" for a in actor],
+                "Film": titles[film],
+                "Year": film_year[film],
+                "Votes": film_votes[film],
+                "Rating": film_rating[film],
+                "FilmID": [f"tt{m:07d}" for m in film],
+            }).to_csv(f, header=False, index=False)
+
+
+# ===============================
+# PENGUKURAN
+# ===============================
+def measure(fn, repeat):
+    """Latensi (ms) untuk ``repeat`` panggilan lalu puncak memori satu panggilan."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    # Memori diukur terpisah karena tracemalloc memperlambat eksekusi
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings = np.asarray(timings)
+    return {
+        "n": repeat,
+        "mean_ms": float(timings.mean()),
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "peak_mb": peak / 2**20,
+    }
+
+
+def run_size(workdir, rows, actors, repeat, heavy_repeat, batch_size, seed=0):
+    csv_path = os.path.join(workdir, f"actorfilms_{rows}_{actors}.csv")
+    generate_dataset(csv_path, rows, actors, seed=seed)
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    # --- Load dingin ---
+    def load_csv():
+        df = pd.read_csv(csv_path)
+        df.dropna(subset=["Actor", "Film", "Rating"], inplace=True)
+        df["Rating"] = df["Rating"].astype(float)
+
+    results["cold_load_csv"] = measure(load_csv, heavy_repeat)
+    results["ingest_store"] = measure(lambda: build_store(csv_path), heavy_repeat)
+    store = DataStore.open(csv_path)
+    results["cold_load_store"] = measure(lambda: DataStore(store.directory).to_frame(), heavy_repeat)
+
+    # --- Model ---
+    df = store.to_frame()
+    results["model_build"] = measure(lambda: ActorRecommender.from_frame(df), heavy_repeat)
+    engine = RecommendationEngine(store)
+    model = engine.recommender
+    sample = model.actors[rng.integers(0, len(model.actors), size=max(repeat, batch_size))]
+    picks = iter(np.resize(sample, repeat * 2 + 2))
+
+    results["topk_single"] = measure(lambda: model.similar_actors(next(picks), 5), repeat)
+    batch = list(sample[:batch_size])
+    results[f"topk_batch_{batch_size}"] = measure(lambda: model.top_k_batch(batch, 5), heavy_repeat)
+    similar = model.similar_actors(sample[0], 5)
+    results["recommend_films"] = measure(lambda: engine.recommend_films(similar, 10), repeat)
+
+    # --- Agregat visualisasi ---
+    def aggregates_scan():
+        film_data = df[["Film", "Year", "Rating", "Votes"]].drop_duplicates()
+        film_data.groupby("Year").size()
+        film_data.sort_values(by="Rating", ascending=False).head(10)
+        df.groupby("Actor", observed=True).agg({"Film": "count", "Rating": "mean", "Votes": "sum"})
+
+    def aggregates_precomputed():
+        stats = DataStore(store.directory).stats
+        stats.yearly_counts(), stats.rating_histogram(), stats.top_films()
+        stats.top_actors_by_rating(), stats.top_actors_by_films()
+        stats.film_table(slice(0, 100)), stats.actor_summary(slice(0, 100))
+
+    stats_dir = tempfile.mkdtemp(dir=workdir)
+    results["viz_aggregates_scan"] = measure(aggregates_scan, heavy_repeat)
+    results["viz_aggregates_build"] = measure(
+        lambda: build_stats(stats_dir, [{"actor": store.actor_codes, "film": store.film_codes,
+                                         "year": store.year, "votes": store.votes,
+                                         "rating": store.rating}],
+                            len(store.actor_names), len(store.film_names)),
+        heavy_repeat,
+    )
+    results["viz_aggregates_read"] = measure(aggregates_precomputed, repeat)
+    return results
+
+
+# ===============================
+# PERBANDINGAN ANTAR RUN
+# ===============================
+def compare(current, baseline, threshold=0.10):
+    """Baris perbandingan p50/p95 terhadap run sebelumnya; regresi ditandai '!'."""
+    previous = {(r["size"], r["op"]): r for r in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        old = previous.get((result["size"], result["op"]))
+        if old is None:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+        flag = "!" if ratio > 1 + threshold else " "
+        lines.append(
+            f"{flag} {result['size']:>16} {result['op']:<22} "
+            f"p50 {old['p50_ms']:9.2f} -> {result['p50_ms']:9.2f} ms ({ratio:5.2f}x)  "
+            f"p95 {old['p95_ms']:9.2f} -> {result['p95_ms']:9.2f} ms"
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark jalur panas rekomendasi & load data")
+    parser.add_argument("--size", action="append", default=None,
+                        help="ukuran ROWS:ACTORS, boleh diulang (default: 10k:1k, 100k:10k, 1M:100k)")
+    parser.add_argument("--repeat", type=int, default=50, help="ulangan untuk operasi per-request")
+    parser.add_argument("--heavy-repeat", type=int, default=3, help="ulangan untuk load & build")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="direktori data sintetis (default: sementara)")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="file hasil run sebelumnya")
+    parser.add_argument("--threshold", type=float, default=0.10, help="batas regresi p50 (default 10%%)")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="rekomendasi-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": [],
+    }
+    try:
+        for size in args.size or DEFAULT_SIZES:
+            rows, actors = parse_size(size)
+            label = f"{rows}x{actors}"
+            print(f"== {rows:,} baris, {actors:,} aktor")
+            results = run_size(workdir, rows, actors, args.repeat, args.heavy_repeat,
+                               args.batch_size, args.seed)
+            for op, result in results.items():
+                report["results"].append({"size": label, "rows": rows, "actors": actors,
+                                          "op": op, **result})
+                print(f"   {op:<22} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+                      f"p99 {result['p99_ms']:9.2f} ms  peak {result['peak_mb']:8.1f} MB")
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil -> {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines = compare(report, json.load(f), args.threshold)
+        print("\n".join(["Perbandingan dengan " + args.compare] + lines))
+
+
+if __name__ == "__main__":
+    main()
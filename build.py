@@ -0,0 +1,181 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from datastore import DataStore
+from engine import MODEL_DIR
+from recommender import ActorRecommender, build_lock, neighbor_table_path
+
+# ===============================
+# BUILD MODEL PARALEL (OFFLINE)
+# ===============================
+# Hasilnya identik dengan ActorRecommender.from_frame (TfidfVectorizer dengan
+# stop_words="english"), tetapi dikerjakan oleh beberapa proses:
+#   1. token tiap judul film unik dikumpulkan per potongan kamus film
+#   2. vocabulary bersama (terurut) -> matriks film x term per potongan
+#   3. hitungan term per aktor = insiden aktor x film @ film x term, per
+#      rentang aktor yang jumlah barisnya seimbang
+#   4. gabung (vstack), hitung IDF & normalisasi L2, simpan ke <store>/model
+# Worker membaca store lewat memory mapping, jadi data tidak disalin ke
+# setiap proses; hanya hasil sparse per potongan yang dikirim balik.
+_worker = {}
+
+
+def _analyzer():
+    return CountVectorizer(stop_words="english").build_analyzer()
+
+
+def _init_worker(store_dir, vocabulary=None, film_terms_dir=None):
+    _worker["store"] = DataStore(store_dir)
+    _worker["analyzer"] = _analyzer()
+    if vocabulary is not None:
+        _worker["vocabulary"] = {term: i for i, term in enumerate(vocabulary)}
+    if film_terms_dir is not None:
+        _worker["film_terms"] = _load_csr(film_terms_dir)
+
+
+def _film_vocabulary(start, stop):
+    names, analyzer = _worker["store"].film_names, _worker["analyzer"]
+    terms = set()
+    for code in range(start, stop):
+        terms.update(analyzer(names[code]))
+    return terms
+
+
+def _film_term_rows(start, stop):
+    names, analyzer = _worker["store"].film_names, _worker["analyzer"]
+    vocabulary = _worker["vocabulary"]
+    indptr, indices = [0], []
+    for code in range(start, stop):
+        indices.extend(vocabulary[term] for term in analyzer(names[code]))
+        indptr.append(len(indices))
+    rows = sp.csr_matrix(
+        (np.ones(len(indices)), np.asarray(indices, dtype=np.int64), indptr),
+        shape=(stop - start, len(vocabulary)),
+    )
+    rows.sum_duplicates()
+    return rows
+
+
+def _actor_counts(start, stop):
+    store, film_terms = _worker["store"], _worker["film_terms"]
+    index = store.actor_index
+    rows = index.rows[index.offsets[start]:index.offsets[stop]]
+    lengths = np.diff(index.offsets[start:stop + 1])
+    incidence = sp.csr_matrix(
+        (np.ones(len(rows)), (np.repeat(np.arange(stop - start), lengths), store.film_codes[rows])),
+        shape=(stop - start, film_terms.shape[0]),
+    )
+    return incidence @ film_terms
+
+
+def _save_csr(directory, matrix):
+    os.makedirs(directory, exist_ok=True)
+    for name in ("data", "indices", "indptr"):
+        np.save(os.path.join(directory, f"{name}.npy"), getattr(matrix, name))
+    np.save(os.path.join(directory, "shape.npy"), np.asarray(matrix.shape))
+
+
+def _load_csr(directory):
+    def load(name):
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+    return sp.csr_matrix((load("data"), load("indices"), load("indptr")),
+                         shape=tuple(np.load(os.path.join(directory, "shape.npy"))))
+
+
+def _ranges(n, chunk):
+    return [(start, min(start + chunk, n)) for start in range(0, n, chunk)]
+
+
+def _balanced_ranges(offsets, n_chunks):
+    """Rentang kode dengan jumlah baris kira-kira sama (dari offset CSR)."""
+    bounds = np.searchsorted(offsets, np.linspace(0, offsets[-1], n_chunks + 1), side="left")
+    bounds[0], bounds[-1] = 0, len(offsets) - 1
+    bounds = np.unique(bounds)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def tfidf_from_counts(counts):
+    """Bobot TF-IDF seperti TfidfVectorizer (smooth_idf, norm L2) dari hitungan term."""
+    counts = counts.tocsr()
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    weighted = counts.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    weighted = sp.diags(1 / np.where(norms > 0, norms, 1)) @ weighted
+    weighted = weighted.tocsr()
+    weighted.sort_indices()
+    return weighted, idf
+
+
+def build_model(store, workers=None, chunk=20000, log=print):
+    """Bangun ActorRecommender untuk store dengan ProcessPoolExecutor."""
+    workers = workers or os.cpu_count() or 1
+    n_films, n_actors = len(store.film_names), len(store.actor_names)
+    film_chunks = _ranges(n_films, chunk)
+    timer = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(store.directory,)) as pool:
+        terms = set()
+        for part in pool.map(_film_vocabulary, *zip(*film_chunks)):
+            terms |= part
+    vocabulary = sorted(terms)
+    log(f"vocabulary: {len(vocabulary):,} term ({time.perf_counter() - timer:.1f} s)")
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(store.directory, vocabulary)) as pool:
+        film_terms = sp.vstack(list(pool.map(_film_term_rows, *zip(*film_chunks))), format="csr")
+    log(f"film x term: {film_terms.nnz:,} entri ({time.perf_counter() - timer:.1f} s)")
+
+    scratch = tempfile.mkdtemp(prefix=".build-", dir=os.path.dirname(os.path.abspath(store.directory)))
+    try:
+        _save_csr(scratch, film_terms)
+        actor_chunks = _balanced_ranges(np.asarray(store.actor_index.offsets), workers * 4)
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(store.directory, None, scratch)) as pool:
+            counts = sp.vstack(list(pool.map(_actor_counts, *zip(*actor_chunks))), format="csr")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    log(f"aktor x term: {counts.nnz:,} entri ({time.perf_counter() - timer:.1f} s)")
+
+    matrix, idf = tfidf_from_counts(counts)
+    vectorizer = TfidfVectorizer(stop_words="english",
+                                 vocabulary={term: i for i, term in enumerate(vocabulary)})
+    vectorizer.idf_ = idf
+    recommender = ActorRecommender(vectorizer, matrix, store.actor_names, version=store.version)
+    recommender.meta["rows_at_refit"] = len(store)
+    log(f"model {n_actors:,} aktor selesai ({time.perf_counter() - timer:.1f} s)")
+    return recommender
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build model TF-IDF aktor secara paralel")
+    parser.add_argument("csv_path", nargs="?", default="actorfilms.csv")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah CPU)")
+    parser.add_argument("--chunk", type=int, default=20000, help="judul film per tugas tokenisasi")
+    parser.add_argument("--neighbors", type=int, default=0,
+                        help="juga precompute tabel tetangga top-k (0 = tidak)")
+    args = parser.parse_args(argv)
+
+    store = DataStore.open(args.csv_path)
+    recommender = build_model(store, workers=args.workers, chunk=args.chunk)
+    with build_lock(store.directory):
+        recommender.save(os.path.join(store.directory, MODEL_DIR))
+    print(f"model -> {os.path.join(store.directory, MODEL_DIR)}")
+    if args.neighbors:
+        recommender.build_neighbor_table(k=args.neighbors)
+        recommender.save_neighbor_table(neighbor_table_path(args.csv_path))
+        print(f"tabel tetangga k={args.neighbors} -> {neighbor_table_path(args.csv_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# ===============================
+# ESTIMASI UKURAN OBJEK
+# ===============================
+def estimate_size(value):
+    """Perkiraan ukuran (byte) hasil rekomendasi untuk anggaran cache."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ===============================
+# CACHE HASIL LRU
+# ===============================
+class ResultCache:
+    """Cache LRU thread-safe dengan batas jumlah entri dan total byte.
+
+    Kunci diawali versi dataset: ``(version, actor, k, n_films, filters)``.
+    Panggil :meth:`retain_version` saat dataset berganti agar entri lama
+    langsung dibuang.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, nbytes=None):
+        nbytes = estimate_size(value) if nbytes is None else nbytes
+        if nbytes > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.bytes -= evicted_bytes
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def retain_version(self, version):
+        """Buang semua entri milik versi dataset selain ``version``."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] != version]
+            for key in stale:
+                self.bytes -= self._entries.pop(key)[1]
+            self.evictions += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,941 @@
+import argparse
+import bisect
+import heapq
+import json
+import os
+import shutil
+import sys
+import tempfile
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from recommender import build_lock, dataset_version, staging_directory
+from stats import MISSING_YEAR, DatasetStats, append_stats, build_stats, display_years
+
+# ===============================
+# FORMAT STORE KOLUMNAR
+# ===============================
+# Satu direktori per dataset, setiap kolom disimpan sebagai file .npy agar
+# bisa dibuka dengan memory mapping dan dibagi antar proses worker:
+#   meta.json                      versi dataset & jumlah baris
+#   actor_codes.npy / film_codes   kode integer (int32) ke kamus string
+#   rating.npy / votes.npy / year  kolom numerik bertipe
+#   actor_names.* / film_names.*   kamus string terurut (bytes UTF-8 + offset)
+#   actor_index.* / film_index.*   indeks terbalik kode -> baris (gaya CSR)
+#   actor_search.* / film_search.* indeks prefix: nama casefold terurut + kode
+#   stats/                         agregat untuk halaman visualisasi (stats.py)
+STORE_FORMAT = 8
+
+NUMERIC_COLUMNS = {
+    "Rating": ("rating", np.float64),
+    "Votes": ("votes", np.int64),
+    "Year": ("year", np.int32),
+}
+FRAME_COLUMNS = ("Actor", "Film", "Year", "Votes", "Rating")
+
+
+def store_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".store"
+
+
+# ===============================
+# BACA / TULIS KOLOM PER BLOK
+# ===============================
+# Saat ingest, kolom dibaca dan ditulis per blok lewat read/write biasa,
+# bukan memory mapping: page yang sudah diproses tidak tetap terpetakan di
+# proses, sehingga RSS mengikuti ukuran blok, bukan ukuran dataset.
+def _npy_layout(path):
+    """``(offset data, dtype, jumlah elemen)`` dari file .npy satu dimensi."""
+    with open(path, "rb") as f:
+        major, _ = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if major == 1
+                       else np.lib.format.read_array_header_2_0)
+        shape, _, dtype = read_header(f)
+        return f.tell(), dtype, shape[0]
+
+
+def _raw_layout(path, dtype):
+    dtype = np.dtype(dtype)
+    return 0, dtype, os.path.getsize(path) // dtype.itemsize
+
+
+def _read_range(path, start, count, dtype=None):
+    """``count`` elemen mulai ``start`` dari file .npy (file mentah bila ``dtype`` diberikan)."""
+    offset, dtype, _ = _npy_layout(path) if dtype is None else _raw_layout(path, dtype)
+    with open(path, "rb") as f:
+        f.seek(offset + start * dtype.itemsize)
+        return np.fromfile(f, dtype=dtype, count=count)
+
+
+def _read_blocks(path, block_rows, dtype=None):
+    """``(indeks awal, array)`` berurutan, ``block_rows`` elemen per blok."""
+    offset, dtype, n = _npy_layout(path) if dtype is None else _raw_layout(path, dtype)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for start in range(0, n, block_rows):
+            yield start, np.fromfile(f, dtype=dtype, count=min(block_rows, n - start))
+
+
+class _NpyWriter:
+    # .npy satu dimensi yang ditulis berurutan per blok; panjangnya harus diketahui
+    def __init__(self, path, dtype, n):
+        self.dtype = np.dtype(dtype)
+        self.remaining = n = int(n)
+        self.file = open(path, "wb")
+        np.lib.format.write_array_header_1_0(self.file, {
+            "descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (n,),
+        })
+
+    def write(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self.remaining -= len(values)
+        self.file.write(values.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None and self.remaining:
+            raise ValueError(f"{self.file.name}: {self.remaining} elemen belum ditulis")
+
+
+def _raw_to_npy(raw_path, npy_path, dtype, block_rows):
+    """Salin file biner mentah ke .npy per blok lalu hapus file mentahnya."""
+    _, dtype, n = _raw_layout(raw_path, dtype)
+    with _NpyWriter(npy_path, dtype, n) as out:
+        for _, values in _read_blocks(raw_path, block_rows, dtype):
+            out.write(values)
+    os.remove(raw_path)
+
+
+class _StringRuns:
+    """Run string terurut (satu kode int64 per string) di file scratch.
+
+    Dasar sort eksternal: tiap blok ditulis sebagai satu run, lalu
+    :meth:`merged` menggabung semua run dengan heapq.merge sambil membaca
+    tiap run per potongan kecil. String dibandingkan sebagai bytes UTF-8,
+    yang urutannya sama dengan urutan str Python.
+    """
+
+    def __init__(self, directory, name):
+        self.paths = {part: os.path.join(directory, f"{name}.{part}")
+                      for part in ("data", "lengths", "codes")}
+        for path in self.paths.values():
+            open(path, "wb").close()
+        self.runs = []  # (entry pertama, jumlah entry, byte pertama)
+        self.n_entries = 0
+        self.n_bytes = 0
+
+    def add(self, strings, codes):
+        encoded = [s.encode("utf-8") for s in strings]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        with open(self.paths["data"], "ab") as f:
+            f.write(b"".join(encoded))
+        for part, values in (("lengths", lengths), ("codes", np.asarray(codes, dtype=np.int64))):
+            with open(self.paths[part], "ab") as f:
+                f.write(values.data)
+        self.runs.append((self.n_entries, len(encoded), self.n_bytes))
+        self.n_entries += len(encoded)
+        self.n_bytes += int(lengths.sum())
+
+    def _entries(self, run, batch):
+        first, count, position = self.runs[run]
+        for start in range(0, count, batch):
+            n = min(batch, count - start)
+            lengths = _read_range(self.paths["lengths"], first + start, n, np.int64)
+            codes = _read_range(self.paths["codes"], first + start, n, np.int64).tolist()
+            bounds = [0] + np.cumsum(lengths).tolist()
+            with open(self.paths["data"], "rb") as f:
+                f.seek(position)
+                raw = f.read(bounds[-1])
+            position += bounds[-1]
+            for i, code in enumerate(codes):
+                yield raw[bounds[i]:bounds[i + 1]], code, run
+
+    def merged(self, memory_rows):
+        """Semua entry urut ``(bytes, kode)``, sebagai tuple ``(bytes, kode, run)``."""
+        batch = max(64, memory_rows // max(len(self.runs), 1))
+        return heapq.merge(*(self._entries(run, batch) for run in range(len(self.runs))))
+
+
+class _DictionaryWriter:
+    # StringDictionary yang diisi berurutan; jumlah nama baru diketahui di akhir
+    def __init__(self, directory, name, scratch):
+        self.targets = {part: os.path.join(directory, f"{name}.{part}.npy") for part in ("data", "offsets")}
+        self.raw = {part: os.path.join(scratch, f"{name}.{part}") for part in ("data", "offsets")}
+        self.data = open(self.raw["data"], "wb")
+        self.offsets = open(self.raw["offsets"], "wb")
+        self.pending = [0]
+        self.position = 0
+
+    def append(self, encoded):
+        self.data.write(encoded)
+        self.position += len(encoded)
+        self.pending.append(self.position)
+        if len(self.pending) >= 4096:
+            self._flush()
+
+    def _flush(self):
+        self.offsets.write(np.asarray(self.pending, dtype=np.int64).data)
+        self.pending = []
+
+    def close(self, block_rows):
+        self._flush()
+        self.data.close()
+        self.offsets.close()
+        _raw_to_npy(self.raw["data"], self.targets["data"], np.uint8, block_rows * 8)
+        _raw_to_npy(self.raw["offsets"], self.targets["offsets"], np.int64, block_rows)
+
+
+# ===============================
+# KAMUS STRING
+# ===============================
+class StringDictionary:
+    """Daftar string terurut yang disimpan sebagai bytes UTF-8 + offset."""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    @classmethod
+    def load(cls, directory, name, mmap_mode="r"):
+        data = np.load(os.path.join(directory, f"{name}.data.npy"), mmap_mode=mmap_mode)
+        offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode=mmap_mode)
+        return cls(data, offsets)
+
+    def save(self, directory, name):
+        np.save(os.path.join(directory, f"{name}.data.npy"), self.data)
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        if np.ndim(code):
+            return self.take(code)
+        lo, hi = self.offsets[code], self.offsets[code + 1]
+        return self.data[lo:hi].tobytes().decode("utf-8")
+
+    def take(self, codes):
+        """Array object berisi string untuk ``codes``; hanya byte yang dibutuhkan yang dibaca."""
+        codes = np.asarray(codes, dtype=np.int64)
+        starts, ends = self.offsets[codes].tolist(), self.offsets[codes + 1].tolist()
+        names = np.empty(len(codes), dtype=object)
+        names[:] = [self.data[lo:hi].tobytes().decode("utf-8") for lo, hi in zip(starts, ends)]
+        return names
+
+    def to_list(self):
+        raw = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(self))]
+
+    def code_of(self, name):
+        """Kode string lewat binary search (kamus terurut), -1 bila tidak ada."""
+        code = bisect.bisect_left(_DictionaryView(self), name)
+        if code < len(self) and self[code] == name:
+            return code
+        return -1
+
+    def codes_of(self, names):
+        """Array kode untuk banyak nama (-1 untuk yang tidak ada)."""
+        return np.fromiter(map(self.code_of, names), dtype=np.int64, count=len(names))
+
+
+def _dictionary_blocks(directory, name, block):
+    """``(kode awal, list nama)`` per ``block`` nama dari kamus yang tersimpan."""
+    offsets_path = os.path.join(directory, f"{name}.offsets.npy")
+    data_path = os.path.join(directory, f"{name}.data.npy")
+    n = _npy_layout(offsets_path)[2] - 1
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        bounds = _read_range(offsets_path, start, stop - start + 1)
+        raw = _read_range(data_path, int(bounds[0]), int(bounds[-1] - bounds[0])).tobytes()
+        bounds = (bounds - bounds[0]).tolist()
+        yield start, [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(stop - start)]
+
+
+class _DictionaryView:
+    # Sequence ringan agar bisect bisa berjalan langsung di atas kamus
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.dictionary)
+
+    def __getitem__(self, code):
+        return self.dictionary[code]
+
+
+# ===============================
+# INDEKS PENCARIAN PREFIX
+# ===============================
+class PrefixIndex:
+    """Nama dalam bentuk casefold yang sudah terurut, beserta kode aslinya.
+
+    Pencarian prefix cukup dua binary search, lalu mengambil potongan
+    ``codes`` sebanyak ``limit`` tanpa menyentuh nama lain.
+    """
+
+    def __init__(self, keys, codes):
+        self.keys = keys
+        self.codes = codes
+
+    @staticmethod
+    def build(directory, name, names_name, scratch, memory_rows):
+        """Tulis indeks untuk kamus ``names_name`` di ``directory`` lewat sort
+        eksternal: nama casefold diurutkan per blok, lalu run-nya digabung.
+        Nama yang sama setelah casefold tetap berurutan menurut kodenya."""
+        runs = _StringRuns(scratch, name)
+        for start, names in _dictionary_blocks(directory, names_name, memory_rows):
+            folded = [name.casefold() for name in names]
+            order = sorted(range(len(folded)), key=folded.__getitem__)
+            runs.add([folded[i] for i in order], start + np.asarray(order, dtype=np.int64))
+        entries = ((encoded, code) for encoded, code, _ in runs.merged(memory_rows))
+        PrefixIndex._write(directory, name, entries, runs.n_entries, scratch, memory_rows)
+
+    @staticmethod
+    def build_merged(directory, name, old_directory, code_map, added, added_codes, scratch, memory_rows):
+        """Tulis indeks dari indeks lama di ``old_directory`` ditambah nama
+        ``added`` berkode ``added_codes``, tanpa sort ulang: entri lama sudah
+        urut (nama casefold, kode) dan ``code_map`` tidak mengubah urutan kode."""
+        codes_path = os.path.join(old_directory, f"{name}.codes.npy")
+
+        def old_entries():
+            keys = _dictionary_blocks(old_directory, f"{name}.keys", memory_rows)
+            for (_, block), (_, codes) in zip(keys, _read_blocks(codes_path, memory_rows)):
+                yield from zip((key.encode("utf-8") for key in block), code_map[codes].tolist())
+
+        new_entries = sorted(zip((name.casefold().encode("utf-8") for name in added), added_codes.tolist()))
+        n_entries = _npy_layout(codes_path)[2] + len(new_entries)
+        PrefixIndex._write(directory, name, heapq.merge(old_entries(), new_entries), n_entries,
+                           scratch, memory_rows)
+
+    @staticmethod
+    def _write(directory, name, entries, n_entries, scratch, memory_rows):
+        # ``entries`` adalah (nama casefold UTF-8, kode) yang sudah terurut
+        keys = _DictionaryWriter(directory, f"{name}.keys", scratch)
+        with _NpyWriter(os.path.join(directory, f"{name}.codes.npy"), np.int32, n_entries) as out:
+            codes = []
+            for encoded, code in entries:
+                keys.append(encoded)
+                codes.append(code)
+                if len(codes) >= 4096:
+                    out.write(codes)
+                    codes = []
+            out.write(codes)
+        keys.close(memory_rows)
+
+    @classmethod
+    def load(cls, directory, name, mmap_mode="r"):
+        keys = StringDictionary.load(directory, f"{name}.keys", mmap_mode)
+        codes = np.load(os.path.join(directory, f"{name}.codes.npy"), mmap_mode=mmap_mode)
+        return cls(keys, codes)
+
+    def save(self, directory, name):
+        self.keys.save(directory, f"{name}.keys")
+        np.save(os.path.join(directory, f"{name}.codes.npy"), self.codes)
+
+    def search(self, prefix, limit=50, offset=0):
+        """Kode nama yang diawali ``prefix`` (tanpa beda huruf besar/kecil)."""
+        prefix = prefix.casefold()
+        view = _DictionaryView(self.keys)
+        lo = bisect.bisect_left(view, prefix)
+        hi = bisect.bisect_left(view, prefix + "\U0010ffff") if prefix else len(view)
+        start = lo + offset
+        return np.asarray(self.codes[start:min(start + limit, hi)]), hi - lo
+
+
+# ===============================
+# INDEKS TERBALIK (CSR)
+# ===============================
+class InvertedIndex:
+    """Pemetaan kode -> nomor baris: baris untuk kode c ada di
+    ``rows[offsets[c]:offsets[c + 1]]`` dengan urutan baris asli."""
+
+    def __init__(self, offsets, rows):
+        self.offsets = offsets
+        self.rows = rows
+
+    @staticmethod
+    def build(directory, name, codes_path, n_codes, memory_rows):
+        """Tulis indeks untuk kolom kode .npy ``codes_path`` (lihat _counting_sort)."""
+        n_rows = _npy_layout(codes_path)[2]
+        with _NpyWriter(os.path.join(directory, f"{name}.rows.npy"), np.int64, n_rows) as rows_out:
+            offsets = _counting_sort(lambda: _read_blocks(codes_path, memory_rows),
+                                     n_codes, rows_out, memory_rows)
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+
+    @classmethod
+    def load(cls, directory, name, mmap_mode="r"):
+        offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode=mmap_mode)
+        rows = np.load(os.path.join(directory, f"{name}.rows.npy"), mmap_mode=mmap_mode)
+        return cls(offsets, rows)
+
+    def save(self, directory, name):
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), self.offsets)
+        np.save(os.path.join(directory, f"{name}.rows.npy"), self.rows)
+
+    def __getitem__(self, code):
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+    @staticmethod
+    def build_merged(directory, name, old_directory, code_map, n_codes, delta_codes, first_row,
+                     memory_rows):
+        """Tulis indeks setelah baris delta ditambahkan di akhir tabel.
+
+        ``code_map`` memetakan kode lama ke kode baru (kamus yang sudah
+        digabung) dan ``delta_codes`` adalah kode baru untuk baris delta yang
+        bernomor mulai ``first_row``. Baris indeks lama dialirkan per blok
+        tanpa sort ulang; baris delta disisipkan di akhir daftar kodenya.
+        """
+        old_offsets = np.load(os.path.join(old_directory, f"{name}.offsets.npy"))
+        counts = np.zeros(n_codes, dtype=np.int64)
+        counts[code_map] = np.diff(old_offsets)
+        offsets = np.zeros(n_codes + 1, dtype=np.int64)
+        np.cumsum(counts + np.bincount(delta_codes, minlength=n_codes), out=offsets[1:])
+
+        # Posisi sisip di baris lama: sesudah baris kode lama terakhir yang <= kode delta
+        order = np.argsort(delta_codes, kind="stable")
+        delta_rows = first_row + order
+        insert_at = old_offsets[np.searchsorted(code_map, delta_codes[order], side="right")]
+        with _NpyWriter(os.path.join(directory, f"{name}.rows.npy"), np.int64, offsets[-1]) as out:
+            lo = 0
+            for start, rows in _read_blocks(os.path.join(old_directory, f"{name}.rows.npy"), memory_rows):
+                hi = int(np.searchsorted(insert_at, start + len(rows)))
+                out.write(np.insert(rows, insert_at[lo:hi] - start, delta_rows[lo:hi]))
+                lo = hi
+            out.write(delta_rows[lo:])
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+
+    def lookup_many(self, codes):
+        """Gabungan baris beberapa kode, diurutkan kembali ke urutan baris asli."""
+        parts = [self[code] for code in codes]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+
+# ===============================
+# SORT DI LUAR MEMORI
+# ===============================
+def _counting_sort(blocks, n_codes, rows_out, memory_rows):
+    """Tulis nomor baris urut (kode, baris) ke ``rows_out``; kembalikan offsets CSR.
+
+    ``blocks()`` menghasilkan ulang ``(baris awal, kode)`` per blok. Hitungan
+    per kode dijumlah dengan bincount per blok, lalu baris untuk tiap rentang
+    kode yang muat ``memory_rows`` dikumpulkan dalam satu lintasan,
+    diurutkan di memori dan ditulis berurutan. Kode yang sendirian melebihi
+    batas itu langsung dialirkan (barisnya sudah urut).
+    """
+    counts = np.zeros(n_codes, dtype=np.int64)
+    for _, codes in blocks():
+        counts += np.bincount(codes, minlength=n_codes)
+    offsets = np.zeros(n_codes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    del counts
+
+    lo = 0
+    while lo < n_codes:
+        hi = int(np.searchsorted(offsets, offsets[lo] + memory_rows, side="right")) - 1
+        hi = min(max(hi, lo + 1), n_codes)
+        parts = []
+        if offsets[hi] > offsets[lo]:
+            for start, codes in blocks():
+                selected = np.flatnonzero((codes >= lo) & (codes < hi))
+                if hi - lo == 1:
+                    rows_out.write(start + selected)
+                elif len(selected):
+                    parts.append((codes[selected], start + selected))
+        if parts:
+            codes = np.concatenate([part[0] for part in parts])
+            rows = np.concatenate([part[1] for part in parts])
+            del parts
+            rows_out.write(rows[np.argsort(codes, kind="stable")])
+        lo = hi
+    return offsets
+
+
+# ===============================
+# INGEST CSV -> STORE
+# ===============================
+CSV_COLUMNS = ["Actor", "Film", "Year", "Votes", "Rating"]
+
+
+def clean_frame(df):
+    """Buang baris tanpa Actor/Film/Rating dan ubah kolom numerik ke tipe store.
+
+    Year dan Votes yang kosong disimpan sebagai 0; Year 0 dibaca sebagai
+    "tidak diketahui" (stats.MISSING_YEAR) oleh agregat dan tampilan.
+    """
+    df = df.dropna(subset=["Actor", "Film", "Rating"])
+    cleaned = {"Actor": df["Actor"].astype(str), "Film": df["Film"].astype(str)}
+    for column in NUMERIC_COLUMNS:
+        cleaned[column] = pd.to_numeric(df[column], errors="coerce")
+    cleaned = pd.DataFrame(cleaned).dropna(subset=["Rating"])
+    for column, (_, dtype) in NUMERIC_COLUMNS.items():
+        cleaned[column] = cleaned[column].fillna(0).astype(dtype)
+    return cleaned
+
+
+INGEST_MEMORY_MB = 256
+_SAMPLE_ROWS = 10_000
+# Perkiraan salinan per chunk: DataFrame mentah + hasil dropna/astype di clean_frame
+_CHUNK_COPIES = 4
+# Perkiraan byte per baris saat membangun indeks & statistik: kode blok,
+# nomor baris int64, hasil argsort dan salinan sementaranya
+_INDEX_ROW_BYTES = 64
+# Satu nama di blok (str asli & casefold, bytes UTF-8, entri list) memakan
+# kira-kira sebanyak 16 baris kolom
+_NAME_ROWS_DIVISOR = 16
+
+
+def _memory_rows(memory_mb):
+    """Jumlah baris per blok agar satu langkah pembangunan indeks muat ``memory_mb``."""
+    return max(1 << 12, int(memory_mb * 2**20 / _INDEX_ROW_BYTES))
+
+
+def chunk_rows_for(csv_path, memory_mb=INGEST_MEMORY_MB):
+    """Jumlah baris per chunk agar parsing satu chunk muat dalam ``memory_mb``."""
+    sample = pd.read_csv(csv_path, usecols=CSV_COLUMNS, nrows=_SAMPLE_ROWS)
+    if sample.empty:
+        return _SAMPLE_ROWS
+    row_bytes = sample.memory_usage(deep=True).sum() / len(sample)
+    return max(1000, int(memory_mb * 2**20 / (row_bytes * _CHUNK_COPIES)))
+
+
+def _zip_blocks(paths, block_rows):
+    """Dict ``nama -> array`` per blok baris dari beberapa kolom .npy yang sama panjang."""
+    readers = [_read_blocks(path, block_rows) for path in paths.values()]
+    for parts in zip(*readers):
+        yield {name: values for name, (_, values) in zip(paths, parts)}
+
+
+def _column_blocks(directory, memory_rows):
+    """Dict kolom ``actor``, ``film``, ``year``, ``votes``, ``rating`` per blok baris."""
+    files = {"actor": "actor_codes", "film": "film_codes", "year": "year", "votes": "votes", "rating": "rating"}
+    return _zip_blocks({name: os.path.join(directory, f"{file}.npy") for name, file in files.items()},
+                       memory_rows)
+
+
+def _finish_store(directory, version, memory_mb):
+    """Bangun indeks, statistik dan meta dari kolom & kamus di ``directory``.
+
+    Semua langkah berjalan per blok (lihat _counting_sort, PrefixIndex.build
+    dan stats.build_stats), jadi memori mengikuti ``memory_mb``, bukan
+    jumlah baris.
+    """
+    memory_rows = _memory_rows(memory_mb)
+    n_rows = _npy_layout(os.path.join(directory, "actor_codes.npy"))[2]
+    n_codes = {name: _npy_layout(os.path.join(directory, f"{name}_names.offsets.npy"))[2] - 1
+               for name in ("actor", "film")}
+    scratch = tempfile.mkdtemp(prefix=".index-", dir=os.path.dirname(os.path.abspath(directory)))
+    try:
+        for name in ("actor", "film"):
+            InvertedIndex.build(directory, f"{name}_index", os.path.join(directory, f"{name}_codes.npy"),
+                                n_codes[name], memory_rows)
+            PrefixIndex.build(directory, f"{name}_search", f"{name}_names", scratch,
+                              memory_rows // _NAME_ROWS_DIVISOR)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    # Satu blok statistik memuat lima kolom plus salinan np.unique / bincount
+    build_stats(directory, _column_blocks(directory, memory_rows // 2), n_codes["actor"], n_codes["film"])
+    _write_meta(directory, version, n_rows)
+
+
+def _write_meta(directory, version, n_rows):
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"format": STORE_FORMAT, "version": version, "rows": int(n_rows)}, f)
+
+
+class _CodeRuns:
+    """Kode nama per chunk CSV tanpa kamus global di memori.
+
+    Tiap chunk menyimpan nama uniknya yang sudah terurut sebagai satu run,
+    dan per baris peringkat nama itu di run-nya. :meth:`finish` menggabung
+    run menjadi kamus terurut lalu menerjemahkan peringkat per chunk ke
+    kode akhir.
+    """
+
+    def __init__(self, scratch, name):
+        self.scratch = scratch
+        self.name = name
+        self.runs = _StringRuns(scratch, name)
+        self.local_path = os.path.join(scratch, f"{name}.local")
+        self.local = open(self.local_path, "wb")
+        self.chunk_rows = []
+
+    def encode(self, values):
+        local, uniques = pd.factorize(values)
+        uniques = np.asarray(uniques, dtype=object)
+        order = np.argsort(uniques, kind="stable")
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        self.runs.add(uniques[order], np.arange(len(order)))
+        self.local.write(rank[local].data)
+        self.chunk_rows.append(len(local))
+
+    def close(self):
+        self.local.close()
+
+    def finish(self, directory, names_name, codes_name, memory_rows):
+        """Tulis kamus ``names_name`` dan kolom ``codes_name`` ke ``directory``."""
+        self.close()
+        runs = self.runs
+        bases = np.zeros(len(runs.runs) + 1, dtype=np.int64)
+        np.cumsum([count for _, count, _ in runs.runs], out=bases[1:])
+        # Peta peringkat -> kode akhir, satu bagian per run; entry satu run
+        # keluar dari merge berurutan, jadi tiap bagian ditulis berurutan juga
+        map_path = os.path.join(self.scratch, f"{self.name}.map")
+        with open(map_path, "wb") as f:
+            f.truncate(int(bases[-1]) * 4)
+        flush = max(64, memory_rows // max(len(runs.runs), 1))
+        pending = [[] for _ in runs.runs]
+        written = bases[:-1].tolist()
+        names = _DictionaryWriter(directory, names_name, self.scratch)
+        fd = os.open(map_path, os.O_WRONLY)
+        try:
+            def flush_run(run):
+                codes = np.asarray(pending[run], dtype=np.int32)
+                os.pwrite(fd, codes.tobytes(), written[run] * 4)
+                written[run] += len(codes)
+                pending[run].clear()
+
+            code, previous = -1, None
+            for encoded, _, run in runs.merged(memory_rows):
+                if encoded != previous:
+                    code, previous = code + 1, encoded
+                    names.append(encoded)
+                pending[run].append(code)
+                if len(pending[run]) >= flush:
+                    flush_run(run)
+            for run in range(len(pending)):
+                if pending[run]:
+                    flush_run(run)
+        finally:
+            os.close(fd)
+        names.close(memory_rows)
+
+        with _NpyWriter(os.path.join(directory, f"{codes_name}.npy"), np.int32, sum(self.chunk_rows)) as out:
+            start = 0
+            for run, n in enumerate(self.chunk_rows):
+                mapping = _read_range(map_path, int(bases[run]), int(bases[run + 1] - bases[run]), np.int32)
+                out.write(mapping[_read_range(self.local_path, start, n, np.int32)])
+                start += n
+
+
+def build_store(csv_path, directory=None, version=None, memory_mb=INGEST_MEMORY_MB,
+                progress=None):
+    """Konversi actorfilms.csv menjadi store kolumnar secara streaming.
+
+    CSV dibaca per chunk (ukurannya dari ``memory_mb``), tiap chunk
+    divalidasi dengan clean_frame lalu kolomnya langsung ditulis ke disk.
+    Kamus nama dibentuk dengan merge run nama unik per chunk, dan indeks
+    serta statistik dibangun per blok (_finish_store), sehingga puncak
+    memori seluruh ingest mengikuti ``memory_mb``, bukan ukuran file.
+    ``progress`` (opsional) dipanggil per chunk dengan dict ``rows``,
+    ``kept``, ``rejected``, ``bytes_read`` dan ``bytes_total``.
+    """
+    directory = directory or store_path(csv_path)
+    version = version or dataset_version(csv_path)
+    chunk_rows = chunk_rows_for(csv_path, memory_mb)
+    memory_rows = _memory_rows(memory_mb)
+    report = {"rows": 0, "kept": 0, "rejected": 0, "bytes_read": 0,
+              "bytes_total": os.path.getsize(csv_path)}
+
+    with staging_directory(directory, prefix=".store-") as tmp_dir:
+        scratch = tempfile.mkdtemp(prefix=".ingest-", dir=os.path.dirname(os.path.abspath(directory)))
+        try:
+            names = {"actor": _CodeRuns(scratch, "actor"), "film": _CodeRuns(scratch, "film")}
+            paths = {name: os.path.join(scratch, name) for name, _ in NUMERIC_COLUMNS.values()}
+            files = {name: open(path, "wb") for name, path in paths.items()}
+            try:
+                with open(csv_path, "rb") as source:
+                    for chunk in pd.read_csv(source, usecols=CSV_COLUMNS, chunksize=chunk_rows):
+                        df = clean_frame(chunk)
+                        names["actor"].encode(df["Actor"])
+                        names["film"].encode(df["Film"])
+                        for column, (name, _) in NUMERIC_COLUMNS.items():
+                            files[name].write(df[column].to_numpy().tobytes())
+                        report["rows"] += len(chunk)
+                        report["kept"] += len(df)
+                        report["rejected"] += len(chunk) - len(df)
+                        report["bytes_read"] = source.tell()
+                        if progress:
+                            progress(dict(report))
+            finally:
+                for f in files.values():
+                    f.close()
+                for runs in names.values():
+                    runs.close()
+
+            for name, runs in names.items():
+                runs.finish(tmp_dir, f"{name}_names", f"{name}_codes", memory_rows // _NAME_ROWS_DIVISOR)
+            for name, dtype in NUMERIC_COLUMNS.values():
+                _raw_to_npy(paths[name], os.path.join(tmp_dir, f"{name}.npy"), dtype, memory_rows)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        _finish_store(tmp_dir, version, memory_mb)
+    return directory
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ===============================
+# TAMBAH BARIS KE STORE
+# ===============================
+def _merge_names(directory, old_directory, name, values, scratch, memory_rows):
+    """Kamus & indeks prefix ``name`` di ``old_directory`` ditambah nama baru
+    dari ``values``, ditulis per blok ke ``directory``.
+
+    Mengembalikan ``(peta kode lama -> baru, kode untuk values, jumlah kode)``.
+    Hanya nama unik ``values`` yang disimpan di memori; kamus lama dibaca
+    lewat binary search dan dialirkan.
+    """
+    old = StringDictionary.load(old_directory, f"{name}_names")
+    view = _DictionaryView(old)
+    lookup, added, positions = {}, [], []
+    for value in sorted(set(values)):
+        position = bisect.bisect_left(view, value)
+        if position < len(old) and old[position] == value:
+            lookup[value] = position
+        else:
+            added.append(value)
+            positions.append(position)
+    # Kode lama bergeser sebanyak nama baru yang urut sebelumnya
+    positions = np.asarray(positions, dtype=np.int64)
+    code_map = np.arange(len(old)) + np.searchsorted(positions, np.arange(len(old)), side="right")
+    added_codes = positions + np.arange(len(added))
+    lookup = {value: int(code_map[code]) for value, code in lookup.items()}
+    lookup.update(zip(added, added_codes.tolist()))
+    codes = np.fromiter(map(lookup.__getitem__, values), dtype=np.int64, count=len(values))
+
+    names = _DictionaryWriter(directory, f"{name}_names", scratch)
+    old_names = (value.encode("utf-8") for _, block in _dictionary_blocks(old_directory, f"{name}_names",
+                                                                         memory_rows) for value in block)
+    for encoded in heapq.merge(old_names, [value.encode("utf-8") for value in added]):
+        names.append(encoded)
+    names.close(memory_rows)
+    PrefixIndex.build_merged(directory, f"{name}_search", old_directory, code_map, added, added_codes,
+                             scratch, memory_rows)
+    return code_map, codes, len(old) + len(added)
+
+
+def append_store(directory, store, delta, version, memory_mb=INGEST_MEMORY_MB):
+    """Tulis ke ``directory`` isi ``store`` ditambah baris DataFrame ``delta``
+    (hasil clean_frame) di akhir tabel.
+
+    Kolom, kamus, indeks dan statistik lama dialirkan per blok dari file
+    store dan hanya digeser/ditambah (lihat _merge_names,
+    InvertedIndex.build_merged dan stats.append_stats), jadi memori
+    mengikuti ``memory_mb`` dan ukuran delta, bukan ukuran dataset.
+    Mengembalikan dict ``actor``/``film`` -> ``(peta kode lama -> baru,
+    kode baris delta)``.
+    """
+    memory_rows = _memory_rows(memory_mb)
+    n_old, n_rows = len(store), len(store) + len(delta)
+    merged = {}
+    scratch = tempfile.mkdtemp(prefix=".append-", dir=os.path.dirname(os.path.abspath(directory)))
+    try:
+        for name, column in (("actor", "Actor"), ("film", "Film")):
+            merged[name] = _merge_names(directory, store.directory, name, delta[column].tolist(),
+                                        scratch, memory_rows // _NAME_ROWS_DIVISOR)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    for name, (code_map, codes, n_codes) in merged.items():
+        with _NpyWriter(os.path.join(directory, f"{name}_codes.npy"), np.int32, n_rows) as out:
+            for _, values in _read_blocks(os.path.join(store.directory, f"{name}_codes.npy"), memory_rows):
+                out.write(code_map[values])
+            out.write(codes)
+        InvertedIndex.build_merged(directory, f"{name}_index", store.directory, code_map, n_codes,
+                                   codes, n_old, memory_rows)
+    for column, (name, dtype) in NUMERIC_COLUMNS.items():
+        with _NpyWriter(os.path.join(directory, f"{name}.npy"), dtype, n_rows) as out:
+            for _, values in _read_blocks(os.path.join(store.directory, f"{name}.npy"), memory_rows):
+                out.write(values)
+            out.write(delta[column].to_numpy())
+
+    rows = {name: codes for name, (_, codes, _) in merged.items()}
+    rows.update((name, delta[column].to_numpy(dtype)) for column, (name, dtype) in NUMERIC_COLUMNS.items())
+    append_stats(directory, store.directory, rows, merged["actor"][0], merged["film"][0],
+                 merged["actor"][2], lambda paths: _zip_blocks(paths, memory_rows // 2), _NpyWriter)
+    _write_meta(directory, version, n_rows)
+    return {name: (code_map, codes) for name, (code_map, codes, _) in merged.items()}
+
+
+# ===============================
+# STORE TER-MEMORY-MAP
+# ===============================
+class DataStore:
+    """Dataset kolumnar read-only yang dibuka dengan memory mapping."""
+
+    def __init__(self, directory, mmap_mode="r"):
+        self.directory = directory
+        self.meta = read_meta(directory)
+        if self.meta is None:
+            raise FileNotFoundError(f"Store tidak ditemukan: {directory}")
+        self.version = self.meta["version"]
+
+        def load(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        self.actor_codes = load("actor_codes")
+        self.film_codes = load("film_codes")
+        self.rating = load("rating")
+        self.votes = load("votes")
+        self.year = load("year")
+        self.actor_names = StringDictionary.load(directory, "actor_names", mmap_mode)
+        self.film_names = StringDictionary.load(directory, "film_names", mmap_mode)
+        self.actor_index = InvertedIndex.load(directory, "actor_index", mmap_mode)
+        self.film_index = InvertedIndex.load(directory, "film_index", mmap_mode)
+        self.actor_search = PrefixIndex.load(directory, "actor_search", mmap_mode)
+        self.film_search = PrefixIndex.load(directory, "film_search", mmap_mode)
+        # Statistik dipetakan bersama kolom & kamus di atas, dari versi yang sama
+        self.stats = DatasetStats(directory, self, mmap_mode)
+
+    @classmethod
+    def open(cls, csv_path, version=None):
+        """Buka store untuk csv_path, membangunnya dulu bila belum ada atau usang.
+
+        Pembangunan memegang build_lock, jadi worker lain yang melihat versi
+        yang sama menunggu lalu memakai store yang sudah jadi.
+        """
+        directory = store_path(csv_path)
+        version = version or dataset_version(csv_path)
+
+        def current():
+            meta = read_meta(directory)
+            return meta is not None and meta.get("format") == STORE_FORMAT and meta.get("version") == version
+
+        if not current():
+            with build_lock(directory):
+                if not current():
+                    build_store(csv_path, directory, version)
+        return cls(directory)
+
+    def __len__(self):
+        return len(self.actor_codes)
+
+    @cached_property
+    def actor_categories(self):
+        return pd.Index(self.actor_names.to_list())
+
+    @cached_property
+    def film_categories(self):
+        return pd.Index(self.film_names.to_list())
+
+    # --- Lookup lewat indeks terbalik, O(ukuran hasil) ---
+    def actor_rows(self, actor):
+        code = self.actor_names.code_of(actor)
+        return self.actor_index[code] if code >= 0 else np.empty(0, dtype=np.int64)
+
+    def film_rows(self, film):
+        code = self.film_names.code_of(film)
+        return self.film_index[code] if code >= 0 else np.empty(0, dtype=np.int64)
+
+    # --- Pencarian nama untuk picker (urut nama, tanpa beda huruf) ---
+    def search_actors(self, prefix, limit=50):
+        codes, total = self.actor_search.search(prefix, limit)
+        return [self.actor_names[code] for code in codes], total
+
+    def search_films(self, prefix, limit=50):
+        codes, total = self.film_search.search(prefix, limit)
+        return [self.film_names[code] for code in codes], total
+
+    def actors_rows(self, actors):
+        codes = [code for code in map(self.actor_names.code_of, actors) if code >= 0]
+        return self.actor_index.lookup_many(codes)
+
+    # --- Filter nilai pada baris kandidat ---
+    def filter_rows(self, rows, year_min=None, year_max=None, min_rating=None, min_votes=None):
+        """Bagian ``rows`` yang lolos filter (urutan tetap).
+
+        Kolom hanya dibaca pada ``rows`` itu (misalnya baris satu aktor
+        sumber), jadi biayanya mengikuti jumlah kandidat, bukan ukuran tabel.
+        Batas tahun apa pun membuang film yang tahunnya tidak diketahui.
+        """
+        rows = np.asarray(rows)
+        keep = np.ones(len(rows), dtype=bool)
+        for name, lo, hi in (("year", year_min, year_max), ("rating", min_rating, None),
+                             ("votes", min_votes, None)):
+            if lo is None and hi is None:
+                continue
+            values = getattr(self, name)[rows]
+            if name == "year":
+                keep &= values != MISSING_YEAR
+            if lo is not None:
+                keep &= values >= lo
+            if hi is not None:
+                keep &= values <= hi
+        return rows[keep]
+
+    def frame(self, rows, columns=FRAME_COLUMNS):
+        """DataFrame kecil untuk ``rows`` tertentu; nama didekode dari kamus
+        ter-mmap, jadi tidak butuh kategori penuh di memori proses."""
+        rows = np.asarray(rows, dtype=np.int64)
+        values = {
+            "Actor": lambda: self.actor_names.take(self.actor_codes[rows]),
+            "Film": lambda: self.film_names.take(self.film_codes[rows]),
+            "Year": lambda: display_years(self.year[rows]),
+            "Votes": lambda: np.asarray(self.votes[rows]),
+            "Rating": lambda: np.asarray(self.rating[rows]),
+        }
+        return pd.DataFrame({name: values[name]() for name in columns}, index=rows)
+
+    def to_frame(self):
+        """DataFrame dengan Actor/Film kategorikal di atas kolom hasil mmap."""
+        actor = pd.Categorical.from_codes(self.actor_codes, categories=self.actor_categories)
+        film = pd.Categorical.from_codes(self.film_codes, categories=self.film_categories)
+        return pd.DataFrame({
+            "Actor": actor,
+            "Film": film,
+            "Year": self.year,
+            "Votes": self.votes,
+            "Rating": self.rating,
+        }, copy=False)
+
+
+# ===============================
+# CLI INGEST
+# ===============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Konversi actorfilms.csv ke store kolumnar")
+    parser.add_argument("csv_path", nargs="?", default="actorfilms.csv")
+    parser.add_argument("--out", default=None, help="direktori store (default: <csv>.store)")
+    parser.add_argument("--memory-mb", type=float, default=INGEST_MEMORY_MB,
+                        help="batas memori ingest: parsing, indeks & statistik (default: 256)")
+    args = parser.parse_args(argv)
+
+    def progress(report):
+        print(f"\r{report['bytes_read'] / max(report['bytes_total'], 1):6.1%}  "
+              f"{report['rows']:,} baris dibaca, {report['rejected']:,} ditolak",
+              end="", file=sys.stderr, flush=True)
+
+    report = {}
+    directory = build_store(args.csv_path, args.out, memory_mb=args.memory_mb,
+                            progress=lambda r: (report.update(r), progress(r)))
+    print(file=sys.stderr)
+    store = DataStore(directory)
+    print(f"{len(store):,} baris ({report.get('rejected', 0):,} ditolak), "
+          f"{len(store.actor_names):,} aktor, {len(store.film_names):,} film -> {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+import functools
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ann import ANN_DIR, AnnIndex
+from cache import ResultCache
+from datastore import DataStore, read_meta
+from metrics import metrics
+from recommender import (
+    ActorRecommender,
+    build_lock,
+    dataset_version,
+    neighbor_table_path,
+    read_model_meta,
+    top_k_indices,
+)
+
+MODEL_DIR = "model"
+# Jeda pemeriksaan versi dataset oleh EngineHolder (detik)
+REFRESH_INTERVAL = 60
+
+FILM_COLUMNS = ["Film", "Actor", "Year", "Rating", "Votes"]
+
+# Bobot skor film: similarity aktor sumber (dijumlah per film, dinormalisasi
+# ke kandidat terbaik), Rating / 10, dan log(1 + Votes) relatif terhadap
+# kandidat dengan votes terbanyak.
+RANKING_WEIGHTS = {"similarity": 0.5, "rating": 0.4, "votes": 0.1}
+
+# Filter film yang didukung (lihat DataStore.filter_rows)
+FILTER_KEYS = ("year_min", "year_max", "min_rating", "min_votes")
+# Batas aktor sumber saat daftar diperdalam agar hasil terfilter tetap n film
+FILTER_MAX_ACTORS = 200
+
+
+# ===============================
+# RANKING FILM (KODE INTEGER)
+# ===============================
+def rank_films(actor_rows, similarity, film_codes, rating, votes, n, weights=RANKING_WEIGHTS,
+               excluded=None, row_filter=None):
+    """Baris wakil untuk top-n film unik beserta skornya.
+
+    ``actor_rows`` berisi array baris per aktor sumber, sejajar dengan
+    ``similarity``. Semua agregasi memakai array berukuran jumlah film
+    (kode integer): similarity dijumlah sekali per pasangan (film, aktor),
+    wakil tiap film adalah baris dari aktor paling mirip yang memuatnya, dan
+    ``excluded`` (mask per kode film) dibuang. ``row_filter`` (opsional)
+    mengembalikan bagian baris aktor yang lolos filter, jadi filter hanya
+    menyentuh baris kandidat. Top-n dipilih dengan argpartition, tanpa sort
+    baris maupun DataFrame.
+    """
+    n_films = len(excluded) if excluded is not None else int(film_codes.max()) + 1
+    sim_sum = np.zeros(n_films)
+    best_rows = np.full(n_films, -1, dtype=np.int64)
+    marker = np.empty(n_films, dtype=np.int64)
+    for i in np.argsort(-np.asarray(similarity), kind="stable"):
+        rows = actor_rows[i]
+        if row_filter is not None:
+            rows = row_filter(rows)
+        films = film_codes[rows]
+        # Satu posisi per film milik aktor ini (scatter), tanpa sort/unique
+        positions = np.arange(len(films))
+        marker[films] = positions
+        sim_sum[films[marker[films] == positions]] += similarity[i]
+        new = best_rows[films] < 0
+        best_rows[films[new]] = rows[new]
+    if excluded is not None:
+        best_rows[excluded] = -1
+
+    candidates = np.flatnonzero(best_rows >= 0)
+    if not len(candidates):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    rows = best_rows[candidates]
+    sims = sim_sum[candidates]
+    log_votes = np.log1p(np.maximum(votes[rows], 0))
+    score = (
+        weights["similarity"] * sims / max(sims.max(), 1e-12)
+        + weights["rating"] * rating[rows] / 10
+        + weights["votes"] * log_votes / max(log_votes.max(), 1e-12)
+    )
+    top = top_k_indices(score, n)
+    return rows[top], score[top]
+
+
+# ===============================
+# ENGINE REKOMENDASI
+# ===============================
+class RecommendationEngine:
+    """Logika rekomendasi yang bisa dipakai oleh app Streamlit maupun API.
+
+    Menggabungkan store kolumnar (data film) dengan model TF-IDF aktor.
+    Model dibangun saat pertama kali dibutuhkan, sekali per engine. Hasil
+    per aktor disimpan di ``cache`` (bisa dibagi antar engine); kuncinya
+    memuat versi dataset, dan entri versi lama dibuang oleh EngineHolder
+    setelah engine baru dipasang, bukan saat engine dibuat, agar engine lama
+    tetap hangat selama versi baru dibangun.
+    """
+
+    def __init__(self, store, neighbor_path=None, cache=None, ann_nprobe=None, ann_rerank=None,
+                 ranking_weights=None):
+        self.store = store
+        self.version = store.version
+        self.neighbor_path = neighbor_path
+        self._recommender = None
+        self._lock = threading.Lock()
+        self.cache = cache if cache is not None else ResultCache()
+        self.ann_nprobe = ann_nprobe
+        self.ann_rerank = ann_rerank
+        self.ranking_weights = self.merge_weights(ranking_weights)
+
+    @classmethod
+    def open(cls, csv_path, version=None, cache=None, ann_nprobe=None, ann_rerank=None,
+             ranking_weights=None):
+        version = version or dataset_version(csv_path)
+        with metrics.span("store_open"):
+            store = DataStore.open(csv_path, version=version)
+        return cls(store, neighbor_path=neighbor_table_path(csv_path), cache=cache,
+                   ann_nprobe=ann_nprobe, ann_rerank=ann_rerank, ranking_weights=ranking_weights)
+
+    @staticmethod
+    def merge_weights(weights):
+        """RANKING_WEIGHTS yang ditimpa ``weights`` (boleh sebagian);
+        ValueError untuk nama yang tidak dikenal atau bobot negatif/tak hingga."""
+        weights = {name: float(w) for name, w in (weights or {}).items()}
+        unknown = set(weights) - set(RANKING_WEIGHTS)
+        if unknown:
+            raise ValueError(f"bobot ranking tidak dikenal: {', '.join(sorted(unknown))}")
+        if not all(np.isfinite(w) and w >= 0 for w in weights.values()):
+            raise ValueError("bobot ranking harus bilangan terhingga yang tidak negatif")
+        return {**RANKING_WEIGHTS, **weights}
+
+    @property
+    def recommender(self):
+        if self._recommender is None:
+            with self._lock:
+                if self._recommender is None:
+                    with metrics.span("model_load"):
+                        recommender = self._load_or_build_model()
+                    if self.ann_nprobe:
+                        with metrics.span("ann_load"):
+                            recommender.ann = self._load_or_build_ann(recommender)
+                        recommender.ann_nprobe = self.ann_nprobe
+                        if self.ann_rerank:
+                            recommender.ann_rerank = self.ann_rerank
+                    if self.neighbor_path and os.path.exists(self.neighbor_path):
+                        with metrics.span("neighbor_table_load"):
+                            recommender.load_neighbor_table(self.neighbor_path)
+                    self._recommender = recommender
+        return self._recommender
+
+    def _load_or_build_model(self):
+        """Model tersimpan di store dipakai bila versinya cocok; bila tidak,
+        fit ulang lalu simpan agar proses lain tidak perlu membangunnya lagi.
+
+        Fit & simpan memegang build_lock store: worker lain menunggu lalu
+        memuat model yang baru disimpan, bukan ikut fit bersamaan.
+        """
+        model_dir = os.path.join(self.store.directory, MODEL_DIR)
+        actors = self.store.actor_names
+
+        def current():
+            meta = read_model_meta(model_dir)
+            return meta and meta.get("version") == self.version and meta["shape"][0] == len(actors)
+
+        if current():
+            return ActorRecommender.load(model_dir, actors)
+        with build_lock(self.store.directory):
+            if current():
+                return ActorRecommender.load(model_dir, actors)
+            recommender = ActorRecommender.from_frame(self.store.to_frame(), version=self.version)
+            self._save_to_store(recommender, model_dir)
+        return recommender
+
+    def _load_or_build_ann(self, recommender):
+        ann_dir = os.path.join(self.store.directory, ANN_DIR)
+
+        def current():
+            meta = read_model_meta(ann_dir)
+            return meta and meta.get("version") == self.version
+
+        if current():
+            return AnnIndex.load(ann_dir)
+        with build_lock(self.store.directory):
+            if current():
+                return AnnIndex.load(ann_dir)
+            ann = AnnIndex.build(recommender.matrix, version=self.version)
+            self._save_to_store(ann, ann_dir)
+        return ann
+
+    def _save_to_store(self, artifact, directory):
+        # Dipanggil di dalam build_lock. Bila direktori store sudah diganti
+        # versi lain (update delta), artefak versi ini tidak boleh menimpanya.
+        meta = read_meta(self.store.directory)
+        if meta is None or meta.get("version") != self.version:
+            return
+        try:
+            artifact.save(directory)
+        except OSError:
+            pass  # store read-only: tetap dipakai dari memori
+
+    def warm_up(self):
+        """Muat semua yang dipakai request pertama: model beserta ANN/tabel
+        tetangga (statistik visualisasi sudah dipetakan bersama store).
+        Semuanya ter-mmap, jadi warm-up hanya memetakan file, bukan menyalin
+        isinya ke memori proses."""
+        self.recommender
+        return self
+
+    def __contains__(self, actor):
+        return actor in self.recommender
+
+    def similar_actors(self, actor, k=5):
+        recommender = self.recommender
+        with metrics.span("similar_actors"):
+            return recommender.similar_actors(actor, k)
+
+    def recommend_films(self, actors, n=10, exclude_films=None, filters=None):
+        """Top-n film unik dari para aktor, satu baris per judul.
+
+        ``actors`` berupa Series ``aktor -> similarity`` (hasil
+        similar_actors) atau list nama (similarity dianggap sama). Skor film
+        memadukan similarity, Rating dan Votes (lihat rank_films).
+        ``exclude_films`` (judul) disaring lewat kode film sebelum ranking;
+        ``filters`` (FILTER_KEYS) pada baris kandidat (DataStore.filter_rows).
+        """
+        return self._rank(actors, n, *self._candidate_masks(exclude_films, filters))
+
+    def _candidate_masks(self, exclude_films=None, filters=None):
+        """``(mask excluded per kode film, row_filter)`` untuk rank_films."""
+        store = self.store
+        excluded = np.zeros(len(store.film_names), dtype=bool)
+        if exclude_films:
+            film_codes = store.film_names.codes_of(list(exclude_films))
+            excluded[film_codes[film_codes >= 0]] = True
+        row_filter = functools.partial(store.filter_rows, **filters) if filters else None
+        return excluded, row_filter
+
+    def _rank(self, actors, n, excluded, row_filter=None):
+        store = self.store
+        with metrics.span("recommend_films"):
+            if isinstance(actors, pd.Series):
+                names, similarity = actors.index, actors.to_numpy(np.float64)
+            else:
+                names, similarity = actors, np.ones(len(actors))
+            codes = store.actor_names.codes_of(names)
+            known = codes >= 0
+            codes, similarity = codes[known], similarity[known]
+            rows, _ = rank_films([store.actor_index[code] for code in codes], similarity,
+                                 store.film_codes, store.rating, store.votes, n,
+                                 self.ranking_weights, excluded, row_filter)
+            # Nama didekode dari kamus ter-mmap hanya untuk baris hasil
+            return store.frame(rows, FILM_COLUMNS)
+
+    def _similar_and_films(self, top_k, k, n_films, masks, similar=None):
+        """Top-k aktor mirip dan film dari mereka.
+
+        ``top_k(depth)`` menghasilkan Series aktor mirip. Tanpa filter cukup
+        k aktor. Dengan filter, daftar aktor sumber film diperdalam (k, 4k,
+        ... FILTER_MAX_ACTORS) sampai n_films film lolos, sehingga hasil
+        tetap berukuran penuh bila datanya ada; aktor mirip yang dikembalikan
+        tetap top-k yang sama seperti tanpa filter.
+        """
+        excluded, row_filter = masks
+        similar = top_k(k) if similar is None else similar
+        sources, depth = similar, k
+        while True:
+            films = self._rank(sources, n_films, excluded, row_filter)
+            if (row_filter is None or len(films) >= n_films or len(sources) < depth
+                    or depth >= FILTER_MAX_ACTORS):
+                return similar, films
+            depth = min(depth * 4, FILTER_MAX_ACTORS)
+            sources = top_k(depth)
+
+    @staticmethod
+    def clean_filters(filters):
+        """Filter tanpa nilai None; ValueError untuk nama filter yang tidak dikenal."""
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"filter tidak dikenal: {', '.join(sorted(unknown))}")
+        return filters
+
+    # --- Hasil lengkap per aktor (melalui cache) ---
+    def _cache_key(self, actor, k, n_films, filters=None):
+        return (self.version, actor, k, n_films, filters)
+
+    @staticmethod
+    def _filter_key(filters, exclude_films=()):
+        items = [("exclude_films", exclude_films)] if exclude_films else []
+        items += [(name, filters[name]) for name in FILTER_KEYS if name in filters]
+        return tuple(items) or None
+
+    def recommend_result(self, actor, k=5, n_films=10, filters=None):
+        """Pasangan ``(similar_actors, recommended_films)`` untuk satu aktor."""
+        filters = self.clean_filters(filters)
+
+        def compute():
+            return self._similar_and_films(lambda depth: self.similar_actors(actor, depth), k, n_films,
+                                           self._candidate_masks(filters=filters))
+
+        return self.cache.get_or_compute(
+            self._cache_key(actor, k, n_films, self._filter_key(filters)), compute)
+
+    def recommend_profile(self, weights, k=5, n_films=10, exclude_films=None, filters=None):
+        """Rekomendasi untuk gabungan beberapa aktor ``{aktor: bobot}``.
+
+        Aktor mirip dihitung dari satu vektor profil (satu perkalian
+        matriks-vektor sparse); film dari aktor-aktor tersebut, tanpa
+        ``exclude_films`` (misalnya film yang sudah ditonton) dan sesuai
+        ``filters``. Aktor tak dikenal diabaikan; hasilnya kosong bila tidak
+        ada yang tersisa.
+        """
+        recommender = self.recommender
+        weights = {actor: float(w) for actor, w in weights.items() if actor in recommender}
+        exclude_films = tuple(sorted(set(exclude_films or ())))
+        filters = self.clean_filters(filters)
+        if not weights:
+            return pd.Series(dtype=float, name="profil"), pd.DataFrame(columns=FILM_COLUMNS)
+
+        def similar_to_profile(depth):
+            with metrics.span("similar_to_profile"):
+                return recommender.similar_to_profile(weights, depth)
+
+        def compute():
+            return self._similar_and_films(similar_to_profile, k, n_films,
+                                           self._candidate_masks(exclude_films, filters))
+
+        key = self._cache_key(("profil",) + tuple(sorted(weights.items())), k, n_films,
+                              self._filter_key(filters, exclude_films))
+        return self.cache.get_or_compute(key, compute)
+
+    def recommend_results(self, actors, k=5, n_films=10, filters=None):
+        """Hasil untuk banyak aktor; yang belum ada di cache dihitung dengan
+        satu perkalian matriks sparse. Aktor tak dikenal tidak disertakan."""
+        filters = self.clean_filters(filters)
+        filter_key = self._filter_key(filters)
+        results = {}
+        pending = []
+        for actor in dict.fromkeys(actors):
+            if actor not in self:
+                continue
+            cached = self.cache.get(self._cache_key(actor, k, n_films, filter_key))
+            if cached is None:
+                pending.append(actor)
+            else:
+                results[actor] = cached
+        recommender = self.recommender
+        with metrics.span("top_k_batch"):
+            batch = recommender.top_k_batch(pending, k)
+        masks = self._candidate_masks(filters=filters)
+        for actor, (ids, scores) in zip(pending, batch):
+            similar = pd.Series(scores, index=recommender.actors[ids], name=actor)
+            result = self._similar_and_films(lambda depth, actor=actor: self.similar_actors(actor, depth),
+                                             k, n_films, masks, similar=similar)
+            results[actor] = self.cache.put(self._cache_key(actor, k, n_films, filter_key), result)
+        return results
+
+    # --- Payload JSON untuk API ---
+    def recommend(self, actor, k=5, n_films=10, filters=None):
+        payload = self._payload(actor, *self.recommend_result(actor, k, n_films, filters))
+        return self._with_filters(payload, filters)
+
+    def recommend_profile_payload(self, weights, k=5, n_films=10, exclude_films=None, filters=None):
+        similar, films = self.recommend_profile(weights, k, n_films, exclude_films, filters)
+        payload = self._payload("profil", similar, films)
+        del payload["actor"]
+        payload["weights"] = {actor: float(w) for actor, w in weights.items() if actor in self}
+        return self._with_filters(payload, filters)
+
+    def recommend_batch(self, actors, k=5, n_films=10, filters=None):
+        """Rekomendasi banyak aktor; skor dihitung dengan satu perkalian sparse."""
+        results = self.recommend_results(actors, k, n_films, filters)
+        return [
+            self._with_filters(self._payload(actor, *results[actor]), filters) if actor in results
+            else {"actor": actor, "error": "aktor tidak ditemukan"}
+            for actor in actors
+        ]
+
+    def _with_filters(self, payload, filters):
+        filters = self.clean_filters(filters)
+        if filters:
+            payload["filters"] = filters
+        return payload
+
+    def _payload(self, actor, similar, films):
+        return {
+            "actor": actor,
+            "version": self.version,
+            "similar_actors": [
+                {"actor": name, "score": round(float(score), 6)}
+                for name, score in similar.items()
+            ],
+            "films": [
+                {
+                    "film": str(row.Film),
+                    "actor": str(row.Actor),
+                    "year": None if pd.isna(row.Year) else int(row.Year),
+                    "rating": float(row.Rating),
+                    "votes": int(row.Votes),
+                }
+                for row in films.itertuples(index=False)
+            ],
+        }
+
+
+# ===============================
+# WARM-UP & REFRESH DI LATAR BELAKANG
+# ===============================
+class EngineHolder:
+    """Engine aktif yang dimuat dan diperbarui oleh thread latar belakang.
+
+    :meth:`start` membangun engine pertama (store, model, statistik) di luar
+    jalur request; :meth:`ready` / :meth:`wait` adalah sinyal kesiapannya.
+    Setelah itu thread yang sama memeriksa versi dataset setiap
+    ``refresh_interval`` detik; versi baru dibangun penuh lebih dulu, lalu
+    ditukar dengan satu assignment sehingga request yang sedang berjalan
+    tetap memakai engine lama sampai selesai. Pemanggil cukup membaca
+    :attr:`engine` sekali per request.
+    """
+
+    def __init__(self, csv_path, cache=None, ann_nprobe=None, ann_rerank=None,
+                 ranking_weights=None, refresh_interval=REFRESH_INTERVAL):
+        self.csv_path = csv_path
+        self.cache = cache if cache is not None else ResultCache()
+        self.ann_nprobe = ann_nprobe
+        self.ann_rerank = ann_rerank
+        # Divalidasi sekarang, bukan baru saat engine pertama dibangun di latar
+        self.ranking_weights = RecommendationEngine.merge_weights(ranking_weights)
+        self.refresh_interval = refresh_interval
+        self.engine = None
+        self.error = None
+        self.refreshed_at = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="engine-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+    def refresh(self):
+        """Bangun & pasang engine bila versi dataset berubah; True bila ditukar."""
+        try:
+            version = dataset_version(self.csv_path)
+            current = self.engine
+            if current is not None and current.version == version:
+                return False
+            with metrics.span("engine_warm_up"):
+                engine = RecommendationEngine.open(self.csv_path, version=version, cache=self.cache,
+                                                   ann_nprobe=self.ann_nprobe,
+                                                   ann_rerank=self.ann_rerank,
+                                                   ranking_weights=self.ranking_weights).warm_up()
+        except Exception as e:  # dicoba lagi pada pemeriksaan berikutnya
+            self.error = f"{type(e).__name__}: {e}"
+            metrics.inc("engine_refresh_errors")
+            return False
+        self.engine = engine
+        self.cache.retain_version(engine.version)
+        self.error = None
+        self.refreshed_at = time.time()
+        metrics.inc("engine_refreshes")
+        self._ready.set()
+        return True
+
+    def status(self):
+        engine = self.engine
+        return {
+            "ready": self.ready(),
+            "version": engine.version if engine is not None else None,
+            "refreshed_at": self.refreshed_at,
+            "error": self.error,
+        }
@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from datastore import (
+    CSV_COLUMNS,
+    INGEST_MEMORY_MB,
+    DataStore,
+    append_store,
+    clean_frame,
+    store_path,
+)
+from engine import MODEL_DIR
+from recommender import (
+    ActorRecommender,
+    build_lock,
+    dataset_version,
+    neighbor_table_path,
+    read_model_meta,
+    read_neighbor_table,
+    staging_directory,
+    top_k_indices,
+    top_k_sparse_rows,
+)
+
+# ===============================
+# KEBIJAKAN REFIT PENUH
+# ===============================
+# Vocabulary & IDF dibekukan di antara refit penuh. Agar drift-nya terbatas,
+# refit penuh dijalankan bila baris baru sejak refit terakhir melebihi
+# MAX_DRIFT dari ukuran dataset saat itu, atau refit terakhir sudah lebih
+# lama dari REFIT_INTERVAL.
+MAX_DRIFT = 0.10
+REFIT_INTERVAL = 7 * 24 * 3600
+
+
+def refit_reason(model, delta_rows, n_rows, max_drift=MAX_DRIFT,
+                 refit_interval=REFIT_INTERVAL, force=False):
+    """Alasan refit penuh, atau None bila update incremental masih boleh."""
+    if force:
+        return "diminta"
+    if model is None:
+        return "model tersimpan tidak tersedia"
+    rows_at_refit = model.meta.get("rows_at_refit") or n_rows
+    if model.meta.get("rows_since_refit", 0) + delta_rows > max_drift * rows_at_refit:
+        return "drift IDF melewati batas"
+    if time.time() - model.meta.get("refit_at", 0) > refit_interval:
+        return "jadwal refit berkala"
+    return None
+
+
+# ===============================
+# PEMBARUAN MODEL
+# ===============================
+def update_model(model, actors, actor_map, affected, documents, version, delta_rows):
+    """Model baru: baris aktor lama dipindah ke kode baru, hanya baris
+    ``affected`` yang di-transform ulang dengan vocabulary/IDF lama."""
+    matrix = model.matrix
+    n_actors = len(actors)
+    padded = sp.vstack([matrix, sp.csr_matrix((1, matrix.shape[1]))], format="csr")
+    take = np.full(n_actors, matrix.shape[0])
+    take[actor_map] = np.arange(matrix.shape[0])
+    keep = np.ones(n_actors)
+    keep[affected] = 0
+    fresh = model.vectorizer.transform(documents)
+    scatter = sp.csr_matrix(
+        (np.ones(len(affected)), (affected, np.arange(len(affected)))),
+        shape=(n_actors, len(affected)),
+    )
+    new_matrix = (sp.diags(keep) @ padded[take] + scatter @ fresh).tocsr()
+    meta = dict(model.meta, rows_since_refit=model.meta.get("rows_since_refit", 0) + delta_rows)
+    return ActorRecommender(model.vectorizer, new_matrix, actors, version=version, meta=meta)
+
+
+def update_neighbor_table(old_ids, old_scores, actor_map, matrix, affected):
+    """Perbarui tabel tetangga hanya untuk aktor terdampak dan tetangganya.
+
+    Aktor terdampak dihitung ulang penuh. Aktor lain menggabungkan daftar
+    lamanya (tanpa aktor terdampak) dengan skor barunya terhadap aktor
+    terdampak. Aktor peringkat k+1 yang tidak tersimpan tidak bisa naik;
+    selisih ini hilang pada refit penuh berikutnya.
+    """
+    n_actors, k = matrix.shape[0], old_ids.shape[1]
+    ids = np.full((n_actors, k), -1, dtype=np.int32)
+    scores = np.zeros((n_actors, k), dtype=np.float32)
+    ids[actor_map] = np.where(old_ids >= 0, actor_map[np.maximum(old_ids, 0)], -1)
+    scores[actor_map] = old_scores
+
+    is_affected = np.zeros(n_actors, dtype=bool)
+    is_affected[affected] = True
+    sims = (matrix @ matrix[affected].T).tocsr()
+    lists_affected = ((ids >= 0) & is_affected[np.maximum(ids, 0)]).any(axis=1)
+    touched = np.flatnonzero((np.diff(sims.indptr) > 0) | lists_affected)
+
+    def set_row(row_id, best_ids, best_scores):
+        ids[row_id], scores[row_id] = -1, 0
+        ids[row_id, :len(best_ids)] = best_ids
+        scores[row_id, :len(best_ids)] = best_scores
+
+    for row_id in touched[~is_affected[touched]]:
+        keep = (ids[row_id] >= 0) & ~is_affected[np.maximum(ids[row_id], 0)]
+        lo, hi = sims.indptr[row_id], sims.indptr[row_id + 1]
+        cand_ids = np.concatenate([ids[row_id][keep], affected[sims.indices[lo:hi]]])
+        cand_scores = np.concatenate([scores[row_id][keep], sims.data[lo:hi]])
+        valid = (cand_ids != row_id) & (cand_scores > 0)
+        cand_ids, cand_scores = cand_ids[valid], cand_scores[valid]
+        best = top_k_indices(cand_scores, k)
+        set_row(row_id, cand_ids[best], cand_scores[best])
+
+    fresh = top_k_sparse_rows(matrix[affected] @ matrix.T, affected, k)
+    for row_id, (best_ids, best_scores) in zip(affected, fresh):
+        set_row(row_id, best_ids, best_scores)
+    return ids, scores
+
+
+# ===============================
+# CSV & VERSI
+# ===============================
+def _csv_append_bytes(csv_path, raw, delta):
+    """Baris delta (yang lolos validasi) dalam urutan kolom header CSV."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    rows = raw.loc[delta.index].reindex(columns=header)
+    for column in CSV_COLUMNS:
+        rows[column] = delta[column]
+    data = rows.to_csv(header=False, index=False).encode("utf-8")
+    with open(csv_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+    return data
+
+
+def _version_after_append(csv_path, data):
+    # Sama dengan dataset_version() dari file setelah data ditambahkan
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(data)
+    return digest.hexdigest()[:16]
+
+
+# ===============================
+# UPDATE INCREMENTAL
+# ===============================
+def apply_delta(csv_path, delta_path, max_drift=MAX_DRIFT,
+                refit_interval=REFIT_INTERVAL, force_refit=False, memory_mb=INGEST_MEMORY_MB):
+    """Tambahkan baris delta ke dataset tanpa membangun ulang semuanya.
+
+    Kolom, kamus, indeks terbalik dan statistik store lama dialirkan per
+    blok lalu digeser/ditambah (datastore.append_store), jadi memori
+    mengikuti ``memory_mb`` dan ukuran delta. Model TF-IDF hanya
+    memperbarui baris aktor yang muncul di delta (dan tabel tetangga untuk
+    aktor tersebut serta tetangganya), kecuali kebijakan refit memutuskan
+    refit penuh. Versi baru aktif saat store diganti secara atomik.
+    """
+    old_version = dataset_version(csv_path)
+    store = DataStore.open(csv_path, version=old_version)
+    raw = pd.read_csv(delta_path)
+    delta = clean_frame(raw.reindex(columns=list(dict.fromkeys(CSV_COLUMNS + list(raw.columns)))))
+    report = {"version": old_version, "rows_added": len(delta), "rejected": len(raw) - len(delta),
+              "actors_updated": 0, "refit": None}
+    if delta.empty:
+        return report
+
+    appended = _csv_append_bytes(csv_path, raw, delta)
+    version = _version_after_append(csv_path, appended)
+
+    model_dir = os.path.join(store.directory, MODEL_DIR)
+    meta = read_model_meta(model_dir)
+    old_model = None
+    n_old_actors = len(store.actor_names)
+    if meta and meta.get("version") == old_version and meta["shape"][0] == n_old_actors:
+        old_model = ActorRecommender.load(model_dir, store.actor_names)
+    reason = refit_reason(old_model, len(delta), len(store), max_drift, refit_interval, force_refit)
+    table_path = neighbor_table_path(csv_path)
+    old_table = (read_neighbor_table(table_path, old_version, n_old_actors)
+                 if os.path.exists(table_path) else None)
+
+    # --- Tulis & aktifkan versi baru ---
+    # CSV ditambah sebelum store diganti, di dalam build_lock: worker yang
+    # melihat CSV baru menunggu kunci lalu mendapati store sudah versi baru,
+    # jadi tidak ada yang membangun ulang store dari nol.
+    with build_lock(store.directory), \
+            staging_directory(store_path(csv_path), prefix=".store-") as tmp_dir:
+        actor_map, delta_actor = append_store(tmp_dir, store, delta, version, memory_mb)["actor"]
+        new_store = DataStore(tmp_dir)
+        affected = np.unique(delta_actor)
+        if reason:
+            model = ActorRecommender.from_frame(new_store.to_frame(), version=version)
+        else:
+            # Dokumen hanya untuk aktor terdampak, dibaca lewat indeks terbalik
+            documents = [" ".join(new_store.film_names.take(new_store.film_codes[new_store.actor_index[code]]))
+                         for code in affected]
+            model = update_model(old_model, new_store.actor_names, actor_map, affected, documents,
+                                 version, len(delta))
+
+        # --- Tabel tetangga (bila dipakai) ---
+        if old_table is not None and reason:
+            model.build_neighbor_table(k=old_table[0].shape[1])
+        elif old_table is not None:
+            model.neighbor_ids, model.neighbor_scores = update_neighbor_table(
+                *old_table, actor_map, model.matrix, affected)
+
+        model.save(os.path.join(tmp_dir, MODEL_DIR))
+        with open(csv_path, "ab") as f:
+            f.write(appended)
+            f.flush()
+            os.fsync(f.fileno())
+    if old_table is not None:
+        model.save_neighbor_table(table_path)
+
+    report.update(version=version, actors_updated=len(affected), refit=reason)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tambahkan file delta Actor/Film ke dataset")
+    parser.add_argument("delta_path")
+    parser.add_argument("--csv", default="actorfilms.csv")
+    parser.add_argument("--max-drift", type=float, default=MAX_DRIFT,
+                        help="proporsi baris baru sebelum refit penuh (default: 0.10)")
+    parser.add_argument("--refit-days", type=float, default=REFIT_INTERVAL / 86400,
+                        help="refit penuh bila refit terakhir lebih lama dari ini")
+    parser.add_argument("--full-refit", action="store_true", help="paksa refit penuh")
+    parser.add_argument("--memory-mb", type=float, default=INGEST_MEMORY_MB,
+                        help="batas memori penggabungan store (default: 256)")
+    args = parser.parse_args(argv)
+
+    report = apply_delta(args.csv, args.delta_path, args.max_drift,
+                         args.refit_days * 86400, args.full_refit, args.memory_mb)
+    refit = f"refit penuh ({report['refit']})" if report["refit"] else "update incremental"
+    print(f"+{report['rows_added']:,} baris ({report['rejected']:,} ditolak), "
+          f"{report['actors_updated']:,} aktor diperbarui, {refit} -> versi {report['version']}")
+
+
+if __name__ == "__main__":
+    main()
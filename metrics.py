@@ -0,0 +1,149 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ===============================
+# KOLEKTOR METRIK RINGAN
+# ===============================
+# Setiap span mencatat jumlah panggilan, total & maksimum durasi, serta
+# histogram berbucket tetap (gaya Prometheus). Biaya per span hanya dua
+# perf_counter dan satu lock, jadi aman dibiarkan aktif di produksi.
+# Span juga dicatat ke "trace" milik thread yang sedang aktif (satu rerun
+# Streamlit atau satu request API) agar rinciannya bisa ditampilkan/di-log.
+PREFIX = "rekomendasi"
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Span:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+
+class Metrics:
+    """Span durasi, counter dan gauge dalam memori proses (thread-safe)."""
+
+    def __init__(self):
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- Pencatatan ---
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = _Span()
+            span.count += 1
+            span.total += seconds
+            span.max = max(span.max, seconds)
+            span.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.append((name, seconds))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    # --- Trace per rerun / request ---
+    def start_trace(self):
+        self._local.trace = []
+        self._local.trace_start = time.perf_counter()
+
+    def end_trace(self):
+        """``(total detik, [(span, detik), ...])`` sejak start_trace di thread ini."""
+        trace = getattr(self._local, "trace", None) or []
+        total = time.perf_counter() - getattr(self._local, "trace_start", time.perf_counter())
+        self._local.trace = None
+        return total, trace
+
+    # --- Ringkasan & ekspor ---
+    def snapshot(self):
+        with self._lock:
+            spans = {
+                name: {"count": s.count, "total_s": s.total, "max_s": s.max,
+                       "mean_s": s.total / s.count if s.count else 0.0}
+                for name, s in self._spans.items()
+            }
+            counters = {_series(name, labels): value for (name, labels), value in self._counters.items()}
+            return {"spans": spans, "counters": counters}
+
+    def render_prometheus(self, gauges=None):
+        """Format teks eksposisi Prometheus (version 0.0.4)."""
+        lines = [f"# TYPE {PREFIX}_span_seconds histogram"]
+        with self._lock:
+            for name, span in sorted(self._spans.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), span.buckets):
+                    cumulative += count
+                    lines.append(f'{PREFIX}_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}_span_seconds_sum{{span="{name}"}} {span.total:.6f}')
+                lines.append(f'{PREFIX}_span_seconds_count{{span="{name}"}} {span.count}')
+            counters = sorted(self._counters.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            lines.append(f"{PREFIX}_{_series(name + '_total', labels)} {value}")
+        for name, value in sorted({**memory_usage(), **(gauges or {})}.items()):
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def memory_usage():
+    """RSS puncak (Unix) dan saat ini (Linux) dalam byte."""
+    usage = {}
+    if resource is not None:
+        usage["process_peak_resident_memory_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        with open("/proc/self/statm") as f:
+            usage["process_resident_memory_bytes"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    return usage
+
+
+def cache_gauges(cache):
+    """Counter ResultCache dalam bentuk gauge Prometheus."""
+    stats = cache.stats()
+    return {
+        "cache_entries": stats["entries"],
+        "cache_bytes": stats["bytes"],
+        "cache_hits": stats["hits"],
+        "cache_misses": stats["misses"],
+        "cache_evictions": stats["evictions"],
+    }
+
+
+# Kolektor bersama untuk satu proses (app Streamlit atau server API)
+metrics = Metrics()
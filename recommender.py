@@ -0,0 +1,415 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa koordinasi antar proses
+    fcntl = None
+
+# ===============================
+# VERSI DATASET
+# ===============================
+_version_memo = {}
+
+
+def dataset_version(path):
+    """Hash isi file dataset, dipakai sebagai kunci cache model."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _version_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _version_memo[memo_key] = digest.hexdigest()[:16]
+    return _version_memo[memo_key]
+
+
+def replace_directory(src, dst):
+    """Ganti direktori dst dengan src secara atomik (rename), lalu hapus yang lama."""
+    if os.path.exists(dst):
+        old = dst + f".old-{os.getpid()}"
+        os.replace(dst, old)
+        os.replace(src, dst)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(src, dst)
+
+
+@contextlib.contextmanager
+def staging_directory(directory, prefix=".staging-"):
+    """Tulis ke direktori sementara; bila sukses ganti ``directory`` sekaligus."""
+    parent = os.path.dirname(os.path.abspath(directory))
+    tmp_dir = tempfile.mkdtemp(prefix=prefix, dir=parent)
+    try:
+        yield tmp_dir
+        replace_directory(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+@contextlib.contextmanager
+def build_lock(directory):
+    """Kunci eksklusif antar proses (flock pada ``<directory>.lock``).
+
+    Dipegang selama membangun dan menyimpan isi ``directory``: bila semua
+    worker di host melihat versi baru bersamaan, hanya satu yang membangun,
+    sisanya menunggu lalu membaca ulang meta.json dan memakai hasilnya.
+    Tanpa kunci bila file kunci tidak bisa dibuat (lokasi read-only).
+    """
+    try:
+        lock_file = open(os.path.normpath(directory) + ".lock", "a")
+    except OSError:
+        yield
+        return
+    with lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+# ===============================
+# SELEKSI TOP-K
+# ===============================
+# Aktor per perkalian sparse pada top_k_batch; setiap baris hasil bisa
+# memuat puluhan ribu entri bukan nol pada katalog besar
+BATCH_BLOCK_SIZE = 128
+
+
+def top_k_indices(scores, k, exclude=None):
+    """Indeks k skor tertinggi (urut menurun) memakai argpartition, bukan sort penuh."""
+    scores = np.asarray(scores)
+    if exclude is not None:
+        scores = scores.copy()
+        scores[exclude] = -np.inf
+        k = min(k, len(scores) - np.size(exclude))
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    # Seri di batas k diisi indeks terkecil (argpartition memilih sembarang),
+    # jadi hasilnya tidak bergantung pada panjang array masukan
+    above = np.flatnonzero(scores > kth)
+    candidates = np.concatenate([above, np.flatnonzero(scores == kth)[:k - len(above)]])
+    # Urutkan kandidat: skor menurun, indeks menaik untuk skor yang sama
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def top_k_sparse_rows(block, row_ids, k):
+    """Top-k per baris dari hasil perkalian sparse, tanpa diagonal (aktor itu sendiri).
+
+    Hanya entri bukan nol yang dipertimbangkan, sehingga memori sebanding
+    dengan nnz blok, bukan jumlah aktor. Mengembalikan list ``(ids, scores)``.
+    """
+    block = block.tocsr()
+    block.sort_indices()  # seri diurutkan menurut id aktor, seperti scan padat
+    results = []
+    for offset, row_id in enumerate(row_ids):
+        lo, hi = block.indptr[offset], block.indptr[offset + 1]
+        cols, vals = block.indices[lo:hi], block.data[lo:hi]
+        keep = (cols != row_id) & (vals > 0)
+        cols, vals = cols[keep], vals[keep]
+        best = top_k_indices(vals, k)
+        results.append((cols[best].astype(np.int64), vals[best]))
+    return results
+
+
+# ===============================
+# MODEL REKOMENDASI AKTOR
+# ===============================
+class ActorRecommender:
+    """Model TF-IDF filmografi aktor yang dibangun sekali per versi dataset.
+
+    Menyimpan vectorizer yang sudah di-fit, matriks sparse aktor (baris
+    ternormalisasi L2) dan indeks aktor -> baris, sehingga setiap request
+    cukup mengambil satu baris lalu menghitung skornya.
+    """
+
+    def __init__(self, vectorizer, matrix, actors, version=None, meta=None):
+        self._vectorizer = vectorizer
+        self._vectorizer_dir = None
+        self.matrix = matrix.tocsr()
+        if hasattr(actors, "code_of"):
+            # Kamus nama ter-mmap dari store (StringDictionary): lookup lewat
+            # binary search, tanpa dict / array nama pribadi per proses
+            self.actors = actors
+            self.actor_index = None
+        else:
+            self.actors = np.asarray(actors, dtype=object)
+            self.actor_index = {actor: i for i, actor in enumerate(self.actors)}
+        self.version = version
+        self.neighbor_ids = None
+        self.neighbor_scores = None
+        # Indeks ANN opsional (ann.py) untuk katalog sangat besar
+        self.ann = None
+        self.ann_nprobe = 8
+        self.ann_rerank = 10
+        # Info refit penuh terakhir, untuk membatasi drift IDF (incremental.py)
+        self.meta = meta or {
+            "refit_version": version,
+            "refit_at": time.time(),
+            "rows_at_refit": None,
+            "rows_since_refit": 0,
+        }
+
+    @classmethod
+    def from_frame(cls, df, version=None):
+        actor_group = df.groupby("Actor")["Film"].apply(" ".join)
+        vectorizer = TfidfVectorizer(stop_words="english")
+        matrix = vectorizer.fit_transform(actor_group.values)
+        recommender = cls(vectorizer, matrix, actor_group.index.tolist(), version)
+        recommender.meta["rows_at_refit"] = len(df)
+        return recommender
+
+    # --- Simpan / muat model (CSR + vocabulary + idf) ---
+    def save(self, directory):
+        """Tulis model ke ``directory`` lewat direktori sementara lalu rename."""
+        with staging_directory(directory, prefix=".model-") as tmp_dir:
+            for name in ("data", "indices", "indptr"):
+                np.save(os.path.join(tmp_dir, f"matrix.{name}.npy"), getattr(self.matrix, name))
+            np.save(os.path.join(tmp_dir, "idf.npy"), self.vectorizer.idf_)
+            with open(os.path.join(tmp_dir, "vocabulary.json"), "w") as f:
+                json.dump(self.vectorizer.get_feature_names_out().tolist(), f)
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(dict(self.meta, version=self.version, shape=list(self.matrix.shape)), f)
+
+    @classmethod
+    def load(cls, directory, actors, mmap_mode="r"):
+        """Muat model yang disimpan :meth:`save`; ``actors`` = urutan baris matriks.
+
+        Array CSR dibuka dengan memory mapping sehingga page-nya dibagi oleh
+        semua proses di host. Vocabulary baru dibaca saat vectorizer pertama
+        kali dipakai (update inkremental / simpan ulang), bukan saat serving.
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+
+        def load(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        matrix = sp.csr_matrix(
+            (load("matrix.data"), load("matrix.indices"), load("matrix.indptr")),
+            shape=tuple(meta.pop("shape")), copy=False,
+        )
+        recommender = cls(None, matrix, actors, version=meta.pop("version"), meta=meta)
+        recommender._vectorizer_dir = directory
+        return recommender
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None and self._vectorizer_dir is not None:
+            with open(os.path.join(self._vectorizer_dir, "vocabulary.json")) as f:
+                terms = json.load(f)
+            vectorizer = TfidfVectorizer(
+                stop_words="english", vocabulary={term: i for i, term in enumerate(terms)}
+            )
+            vectorizer.idf_ = np.load(os.path.join(self._vectorizer_dir, "idf.npy"))
+            self._vectorizer = vectorizer
+        return self._vectorizer
+
+    def row_of(self, actor):
+        """Baris matriks untuk ``actor``; KeyError bila tidak dikenal."""
+        if self.actor_index is not None:
+            return self.actor_index[actor]
+        row = self.actors.code_of(actor)
+        if row < 0:
+            raise KeyError(actor)
+        return row
+
+    def __contains__(self, actor):
+        try:
+            self.row_of(actor)
+        except KeyError:
+            return False
+        return True
+
+    def scores(self, actor):
+        """Cosine similarity satu aktor terhadap semua aktor."""
+        row = self.matrix[self.row_of(actor)]
+        return (self.matrix @ row.T).toarray().ravel()
+
+    def _has_neighbors(self, k):
+        return self.neighbor_ids is not None and k <= self.neighbor_ids.shape[1]
+
+    def top_k(self, actor, k=5, exact=False):
+        """Top-k (indeks aktor, skor) tanpa membentuk matriks N x N.
+
+        Urutan sumber: tabel tetangga offline, indeks ANN, lalu scan sparse
+        exact. ``exact=True`` selalu memakai scan exact.
+        """
+        row_id = self.row_of(actor)
+        if not exact and self._has_neighbors(k):
+            ids = self.neighbor_ids[row_id, :k]
+            valid = ids >= 0
+            return ids[valid].astype(np.int64), self.neighbor_scores[row_id, :k][valid]
+        if not exact and self.ann is not None:
+            return self.ann.search(self.matrix, row_id=row_id, k=k, nprobe=self.ann_nprobe,
+                                   rerank=self.ann_rerank, exclude=[row_id])
+        scores = self.scores(actor)
+        ids = top_k_indices(scores, k, exclude=row_id)
+        ids = ids[scores[ids] > 0]
+        return ids, scores[ids]
+
+    def top_k_batch(self, actors, k=5, block_size=BATCH_BLOCK_SIZE, exact=False):
+        """Top-k untuk banyak aktor dengan hasil yang sama seperti :meth:`top_k`.
+
+        Tabel tetangga dan indeks ANN dijawab per aktor lewat top_k. Scan
+        exact memakai satu perkalian ``matrix @ blok.T`` per ``block_size``
+        aktor: aritmetikanya sama dengan :meth:`scores`, jadi skor dan urutan
+        serinya identik. Baris hasil hampir padat (judul berbagi kata umum),
+        jadi memori dibatasi ukuran blok, bukan ukuran batch.
+        """
+        if not exact and (self._has_neighbors(k) or self.ann is not None):
+            return [self.top_k(actor, k) for actor in actors]
+        row_ids = [self.row_of(actor) for actor in actors]
+        results = []
+        for start in range(0, len(row_ids), block_size):
+            block_ids = row_ids[start:start + block_size]
+            block = (self.matrix @ self.matrix[block_ids].T).T
+            results.extend(top_k_sparse_rows(block, block_ids, k))
+        return results
+
+    def similar_actors(self, actor, k=5):
+        """Top-k aktor paling mirip (tanpa aktor itu sendiri) sebagai Series.
+
+        Aktor dengan skor 0 (tidak ada kata judul yang sama) tidak disertakan.
+        """
+        ids, scores = self.top_k(actor, k)
+        return pd.Series(scores, index=self.actors[ids], name=actor)
+
+    # --- Query profil: gabungan beberapa aktor berbobot ---
+    def profile_vector(self, weights):
+        """Vektor profil ternormalisasi L2 dari ``{aktor: bobot}``.
+
+        Satu perkalian sparse (1 x aktor) @ matriks menjumlahkan baris aktor
+        sesuai bobotnya. Bobot harus positif dan terhingga; yang penting hanya
+        rasionya.
+        """
+        row_ids = np.fromiter((self.row_of(actor) for actor in weights), dtype=np.int64,
+                              count=len(weights))
+        values = np.asarray(list(weights.values()), dtype=np.float64)
+        if not len(values) or (values <= 0).any() or not np.isfinite(values).all():
+            raise ValueError("profil butuh minimal satu aktor dengan bobot positif yang terhingga")
+        selector = sp.csr_matrix((values, (np.zeros(len(row_ids), dtype=np.int64), row_ids)),
+                                 shape=(1, self.matrix.shape[0]))
+        vector = (selector @ self.matrix).tocsr()
+        norm = np.sqrt(vector.multiply(vector).sum())
+        return vector / norm if norm > 0 else vector, row_ids
+
+    def top_k_profile(self, weights, k=5, exact=False):
+        """Top-k (indeks aktor, skor) terhadap profil; aktor profil tidak disertakan."""
+        vector, row_ids = self.profile_vector(weights)
+        if not exact and self.ann is not None:
+            return self.ann.search(self.matrix, vector=vector, k=k, nprobe=self.ann_nprobe,
+                                   rerank=self.ann_rerank, exclude=row_ids)
+        scores = (self.matrix @ vector.T).toarray().ravel()
+        ids = top_k_indices(scores, k, exclude=row_ids)
+        ids = ids[scores[ids] > 0]
+        return ids, scores[ids]
+
+    def similar_to_profile(self, weights, k=5):
+        ids, scores = self.top_k_profile(weights, k)
+        return pd.Series(scores, index=self.actors[ids], name="profil")
+
+    # --- Mode offline: tabel tetangga top-k untuk semua aktor ---
+    def build_neighbor_table(self, k=20, block_size=1024):
+        """Hitung tetangga top-k setiap aktor per blok baris.
+
+        Hasilnya id int32 (``-1`` bila tetangga kurang dari k) dan skor float32
+        berukuran ``n_actors x k``. Hanya satu blok hasil perkalian sparse yang
+        ada di memori pada satu waktu.
+        """
+        n_actors = self.matrix.shape[0]
+        ids = np.full((n_actors, k), -1, dtype=np.int32)
+        scores = np.zeros((n_actors, k), dtype=np.float32)
+        matrix_t = self.matrix.T.tocsc()
+        for start in range(0, n_actors, block_size):
+            row_ids = range(start, min(start + block_size, n_actors))
+            block = self.matrix[start:start + block_size] @ matrix_t
+            for row_id, (best_ids, best_scores) in zip(row_ids, top_k_sparse_rows(block, row_ids, k)):
+                ids[row_id, :len(best_ids)] = best_ids
+                scores[row_id, :len(best_ids)] = best_scores
+        self.neighbor_ids, self.neighbor_scores = ids, scores
+        return ids, scores
+
+    def save_neighbor_table(self, path):
+        """Tulis tabel tetangga sebagai direktori .npy (bisa di-mmap) lalu rename."""
+        with staging_directory(path, prefix=".neighbors-") as tmp_dir:
+            np.save(os.path.join(tmp_dir, "ids.npy"), self.neighbor_ids)
+            np.save(os.path.join(tmp_dir, "scores.npy"), self.neighbor_scores)
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump({"version": self.version or "", "k": int(self.neighbor_ids.shape[1]),
+                           "n_actors": int(self.neighbor_ids.shape[0])}, f)
+
+    def load_neighbor_table(self, path):
+        """Pakai tabel tetangga dari disk bila versi dan jumlah aktornya cocok dengan model."""
+        table = read_neighbor_table(path, self.version, self.matrix.shape[0])
+        if table is None:
+            return False
+        self.neighbor_ids, self.neighbor_scores = table
+        return True
+
+
+def read_model_meta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_neighbor_table(path, version, n_actors, mmap_mode="r"):
+    """``(ids, scores)`` ter-mmap dari direktori tabel tetangga, atau None
+    bila tidak ada, versinya lain, atau jumlah barisnya bukan ``n_actors``.
+
+    Nomor baris tabel adalah kode aktor di store; tabel dari ruang baris lain
+    akan menggeser semua tetangga, jadi lebih baik ditolak dan dibangun ulang.
+    """
+    meta = read_model_meta(path)
+    if meta is None or meta.get("version") != (version or "") or meta.get("n_actors") != n_actors:
+        return None
+    ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mmap_mode)
+    scores = np.load(os.path.join(path, "scores.npy"), mmap_mode=mmap_mode)
+    if ids.shape[0] != n_actors or scores.shape != ids.shape:
+        return None
+    return ids, scores
+
+
+def neighbor_table_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".neighbors"
+
+
+# ===============================
+# CLI OFFLINE
+# ===============================
+def main(argv=None):
+    from engine import RecommendationEngine  # engine sendiri mengimpor modul ini
+
+    parser = argparse.ArgumentParser(description="Precompute tabel tetangga aktor")
+    parser.add_argument("csv_path", nargs="?", default="actorfilms.csv")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--block-size", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    # Ruang baris harus sama dengan engine: kode aktor store (setelah clean_frame)
+    recommender = RecommendationEngine.open(args.csv_path).recommender
+    recommender.build_neighbor_table(k=args.k, block_size=args.block_size)
+    out_path = neighbor_table_path(args.csv_path)
+    recommender.save_neighbor_table(out_path)
+    print(f"{len(recommender.actors):,} aktor, k={args.k} -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import json
+import os
+from contextlib import ExitStack
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# ===============================
+# STATISTIK TERMATERIALISASI
+# ===============================
+# Agregat halaman "Dataset & Visualisasi" dihitung sekali saat ingest dan
+# disimpan di <store>/stats/, sehingga halaman hanya membaca tabel kecil:
+#   summary.json                       metrik ringkas (total film, rentang tahun, ...)
+#   film_table.*.npy                   film unik (Film, Year, Rating, Votes)
+#   yearly.*.npy                       jumlah film unik per tahun
+#   rating_hist.*.npy                  histogram rating film unik (20 bin)
+#   actor_summary.*.npy                jumlah film, rata-rata & total rating, total votes
+#   top_films / top_actors_*.npy       indeks top-N yang sudah terurut
+STATS_DIR = "stats"
+TOP_N = 10
+RATING_BINS = 20
+# Kolom yang menentukan satu baris tabel film unik
+FILM_KEYS = ["film", "year", "rating", "votes"]
+# Year 0 di store berarti tahun tidak diketahui (lihat datastore.clean_frame)
+MISSING_YEAR = 0
+
+
+def display_years(values):
+    """Kolom Year untuk ditampilkan: tahun yang tidak diketahui menjadi <NA>, bukan 0."""
+    values = np.asarray(values)
+    return pd.arrays.IntegerArray(values.astype(np.int32, copy=False), values == MISSING_YEAR)
+
+
+def _top_n(values, n=TOP_N):
+    # Urutan menurun yang stabil: nilai sama mengikuti urutan baris asli
+    return np.argsort(-np.asarray(values), kind="stable")[:n].astype(np.int64)
+
+
+def build_stats(directory, blocks, n_actors, n_films):
+    """Hitung semua agregat dalam satu lintasan lalu tulis ke ``directory/stats``.
+
+    ``blocks`` menghasilkan dict array ``actor``, ``film`` (kode), ``year``,
+    ``votes`` dan ``rating`` per potongan baris berurutan. Yang disimpan di
+    memori hanya array per aktor (bincount) dan per film: (year, rating,
+    votes) kemunculan pertama tiap film. Kombinasi lain untuk judul yang
+    sama (misalnya remake dengan tahun berbeda) dikumpulkan terpisah, jadi
+    tabel film unik sama dengan drop_duplicates atas semua baris.
+    """
+    out = os.path.join(directory, STATS_DIR)
+    os.makedirs(out, exist_ok=True)
+
+    def save(name, values):
+        np.save(os.path.join(out, f"{name}.npy"), values)
+
+    film_count = np.zeros(n_actors, dtype=np.int64)
+    rating_sum = np.zeros(n_actors)
+    votes_sum = np.zeros(n_actors)
+    first_row = np.full(n_films, -1, dtype=np.int64)
+    film_year = np.zeros(n_films, dtype=np.int32)
+    film_rating = np.zeros(n_films)
+    film_votes = np.zeros(n_films, dtype=np.int64)
+    extras = []
+    n_rows = 0
+
+    for block in blocks:
+        actor, film = block["actor"], block["film"]
+        year, votes, rating = block["year"], block["votes"], block["rating"]
+        if not len(actor):
+            continue
+        film_count += np.bincount(actor, minlength=n_actors)
+        rating_sum += np.bincount(actor, weights=rating, minlength=n_actors)
+        votes_sum += np.bincount(actor, weights=votes, minlength=n_actors)
+
+        films, first = np.unique(film, return_index=True)
+        new = first_row[films] < 0
+        films, first = films[new], first[new]
+        first_row[films] = n_rows + first
+        film_year[films], film_rating[films], film_votes[films] = year[first], rating[first], votes[first]
+        other = np.flatnonzero((year != film_year[film]) | (rating != film_rating[film])
+                               | (votes != film_votes[film]))
+        if len(other):
+            extras.append(pd.DataFrame({
+                "film": film[other], "year": year[other], "rating": rating[other],
+                "votes": votes[other], "row": n_rows + other,
+            }).drop_duplicates(subset=FILM_KEYS))
+            if len(extras) > 1:
+                extras = [pd.concat(extras).drop_duplicates(subset=FILM_KEYS)]
+
+        n_rows += len(actor)
+
+    # --- Film unik (urut kemunculan pertama, seperti drop_duplicates) ---
+    codes = np.flatnonzero(first_row >= 0)
+    columns = {"film": codes.astype(np.int32), "year": film_year[codes],
+               "rating": film_rating[codes], "votes": film_votes[codes]}
+    rows = first_row[codes]
+    del first_row, film_year, film_rating, film_votes
+    if extras:
+        columns = {name: np.concatenate([values, extras[0][name].to_numpy(values.dtype)])
+                   for name, values in columns.items()}
+        rows = np.concatenate([rows, extras[0]["row"].to_numpy()])
+    order = np.argsort(rows, kind="stable")
+    del rows
+    for name in FILM_KEYS:
+        columns[name] = columns[name][order]
+        save(f"film_table.{name}", columns[name])
+    del order
+    save("top_films", _top_n(columns["rating"]))
+
+    # Tahun tidak diketahui tidak ikut grafik per tahun (seperti NaN di groupby)
+    years = columns["year"]
+    yearly_years, yearly_counts = np.unique(years[years != MISSING_YEAR], return_counts=True)
+    save("yearly.year", yearly_years)
+    save("yearly.count", yearly_counts.astype(np.int64))
+
+    ratings = columns["rating"]
+    hist_counts, hist_edges = np.histogram(ratings, bins=RATING_BINS)
+    save("rating_hist.count", hist_counts.astype(np.int64))
+    save("rating_hist.edges", hist_edges)
+
+    _finish_stats(out, film_count, rating_sum, votes_sum.astype(np.int64), yearly_years,
+                  len(ratings), float(ratings.max()) if len(ratings) else 0.0)
+
+
+def _finish_stats(out, film_count, rating_sum, total_votes, yearly_years, total_films, top_rating):
+    """Ringkasan aktor (urut nama aktor, sama seperti groupby) dan summary.json.
+
+    Total rating per aktor ikut disimpan agar update incremental cukup
+    menambahkan bincount baris delta (lihat append_stats).
+    """
+    def save(name, values):
+        np.save(os.path.join(out, f"{name}.npy"), values)
+
+    n_actors, n_rows = len(film_count), int(film_count.sum())
+    mean_rating = rating_sum / np.maximum(film_count, 1)
+    save("actor_summary.films", film_count)
+    save("actor_summary.rating", mean_rating)
+    save("actor_summary.rating_sum", rating_sum)
+    save("actor_summary.votes", total_votes)
+    save("top_actors_rating", _top_n(mean_rating))
+    save("top_actors_films", _top_n(film_count))
+
+    summary = {
+        "total_films": int(total_films),
+        "avg_rating": float(rating_sum.sum()) / n_rows if n_rows else 0.0,
+        # Rentang tahun yang diketahui (slider filter di app), 0 bila tidak ada
+        "first_year": int(yearly_years[0]) if len(yearly_years) else MISSING_YEAR,
+        "latest_year": int(yearly_years[-1]) if len(yearly_years) else MISSING_YEAR,
+        # Rating tertinggi per baris = rating tertinggi di tabel film unik
+        "top_rating": top_rating,
+        "total_actors": int(n_actors),
+        "avg_films_per_actor": float(film_count.mean()) if n_actors else 0.0,
+        "top_actor_rating": float(mean_rating.max()) if n_actors else 0.0,
+    }
+    with open(os.path.join(out, "summary.json"), "w") as f:
+        json.dump(summary, f)
+
+
+def append_stats(directory, old_directory, delta, actor_map, film_map, n_actors,
+                 read_blocks, column_writer):
+    """Agregat store di ``old_directory`` ditambah baris ``delta``, ditulis ke
+    ``directory/stats`` tanpa membaca ulang tabel baris.
+
+    ``delta`` berisi array seperti satu blok build_stats (kode baru) dan
+    ``actor_map``/``film_map`` memetakan kode lama ke kode baru. Array per
+    aktor dipindah ke kode baru lalu ditambah bincount delta. Tabel film
+    unik lama dialirkan dua kali lewat ``read_blocks({nama: path})`` (dict
+    array per blok): sekali untuk mencari kombinasi delta yang sudah ada,
+    sekali untuk menyalinnya ke ``column_writer(path, dtype, n)``.
+    Kombinasi baru ditambahkan di akhir, sesuai urutan kemunculan pertama.
+    """
+    old = os.path.join(old_directory, STATS_DIR)
+    out = os.path.join(directory, STATS_DIR)
+    os.makedirs(out, exist_ok=True)
+
+    def load(name, mmap_mode=None):
+        return np.load(os.path.join(old, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    def save(name, values):
+        np.save(os.path.join(out, f"{name}.npy"), values)
+
+    def table_blocks():
+        paths = {name: os.path.join(old, f"film_table.{name}.npy") for name in FILM_KEYS}
+        for block in read_blocks(paths):
+            yield dict(block, film=film_map[block["film"]])
+
+    actor = delta["actor"]
+    film_count = np.zeros(n_actors, dtype=np.int64)
+    rating_sum = np.zeros(n_actors)
+    total_votes = np.zeros(n_actors, dtype=np.int64)
+    film_count[actor_map] = load("actor_summary.films")
+    rating_sum[actor_map] = load("actor_summary.rating_sum")
+    total_votes[actor_map] = load("actor_summary.votes")
+    film_count += np.bincount(actor, minlength=n_actors)
+    rating_sum += np.bincount(actor, weights=delta["rating"], minlength=n_actors)
+    total_votes += np.bincount(actor, weights=delta["votes"], minlength=n_actors).astype(np.int64)
+
+    # --- Lintasan 1: kombinasi delta yang sudah ada & rentang rating ---
+    added = pd.DataFrame({name: delta[name] for name in FILM_KEYS}).drop_duplicates(ignore_index=True)
+    known = np.zeros(len(added), dtype=bool)
+    n_old, lo, hi = 0, np.inf, -np.inf
+    for block in table_blocks():
+        n_old += len(block["film"])
+        lo, hi = min(lo, block["rating"].min()), max(hi, block["rating"].max())
+        candidates = np.isin(block["film"], added["film"].to_numpy())
+        if candidates.any():
+            rows = pd.DataFrame({name: values[candidates] for name, values in block.items()})
+            known[added.reset_index().merge(rows, on=FILM_KEYS)["index"].to_numpy()] = True
+    added = added[~known]
+    if len(added):
+        lo, hi = min(lo, added["rating"].min()), max(hi, added["rating"].max())
+    n_films = n_old + len(added)
+    # Tepi bin sama dengan np.histogram(rating, RATING_BINS) atas seluruh tabel
+    edges = np.histogram_bin_edges(np.array([lo, hi]) if n_films else np.empty(0), bins=RATING_BINS)
+
+    # --- Lintasan 2: salin tabel lama (kode film baru), lalu kombinasi baru ---
+    hist_counts = np.zeros(RATING_BINS, dtype=np.int64)
+    with ExitStack() as stack:
+        writers = {name: stack.enter_context(column_writer(
+            os.path.join(out, f"film_table.{name}.npy"), load(f"film_table.{name}", "r").dtype, n_films))
+            for name in FILM_KEYS}
+        new_block = {name: added[name].to_numpy() for name in FILM_KEYS}
+        for block in chain(table_blocks(), [new_block]):
+            for name, writer in writers.items():
+                writer.write(block[name])
+            hist_counts += np.histogram(block["rating"], bins=edges)[0]
+    save("rating_hist.count", hist_counts)
+    save("rating_hist.edges", edges)
+
+    # Top film lama tetap mengalahkan film lama lain; cukup bandingkan dengan yang baru
+    old_top = load("top_films")
+    positions = np.concatenate([old_top, n_old + np.arange(len(added))])
+    ratings = np.concatenate([load("film_table.rating", "r")[old_top], new_block["rating"]])
+    save("top_films", positions[np.lexsort((positions, -ratings))[:TOP_N]])
+
+    new_years = new_block["year"][new_block["year"] != MISSING_YEAR]
+    yearly_years, inverse = np.unique(np.concatenate([load("yearly.year"), new_years]), return_inverse=True)
+    counts = np.concatenate([load("yearly.count"), np.ones(len(new_years), dtype=np.int64)])
+    save("yearly.year", yearly_years)
+    save("yearly.count", np.bincount(inverse, weights=counts, minlength=len(yearly_years)).astype(np.int64))
+
+    _finish_stats(out, film_count, rating_sum, total_votes, yearly_years, n_films,
+                  float(hi) if n_films else 0.0)
+
+
+class DatasetStats:
+    """Pembaca agregat yang sudah dihitung saat ingest.
+
+    ``store`` dipakai hanya untuk kamus nama aktor/film (kategori). Semua
+    array dipetakan saat objek dibuat, bukan per panggilan: versi baru
+    ditulis ke direktori store yang sama selagi engine lama masih melayani,
+    dan mmap yang sudah terbuka tetap menunjuk file versi lama.
+    """
+
+    def __init__(self, directory, store, mmap_mode="r"):
+        self.directory = os.path.join(directory, STATS_DIR)
+        self.store = store
+        with open(os.path.join(self.directory, "summary.json")) as f:
+            self.summary = json.load(f)
+        self._arrays = {
+            entry[:-len(".npy")]: np.load(os.path.join(self.directory, entry), mmap_mode=mmap_mode)
+            for entry in os.listdir(self.directory) if entry.endswith(".npy")
+        }
+
+    def _load(self, name):
+        return self._arrays[name]
+
+    # Nama didekode dari kamus ter-mmap hanya untuk baris yang diminta
+    def _films(self, codes):
+        return self.store.film_names.take(codes)
+
+    def _actors(self, codes):
+        return self.store.actor_names.take(codes)
+
+    # --- Data Film ---
+    def film_table_size(self):
+        return len(self._load("film_table.film"))
+
+    def film_table(self, rows=None):
+        """Tabel film unik; ``rows`` (slice/indeks) untuk mengambil sebagian saja."""
+        columns = {name: self._load(f"film_table.{name}") for name in ("film", "year", "rating", "votes")}
+        if rows is not None:
+            columns = {name: values[rows] for name, values in columns.items()}
+        return pd.DataFrame({
+            "Film": self._films(columns["film"]),
+            "Year": display_years(columns["year"]),
+            "Rating": columns["rating"],
+            "Votes": columns["votes"],
+        }, copy=False)
+
+    def top_films(self):
+        return self.film_table(rows=self._load("top_films"))
+
+    def yearly_counts(self):
+        return pd.DataFrame({
+            "Year": self._load("yearly.year"),
+            "Jumlah Film": self._load("yearly.count"),
+        })
+
+    def rating_histogram(self):
+        edges = np.asarray(self._load("rating_hist.edges"))
+        return pd.DataFrame({
+            "Rating": (edges[:-1] + edges[1:]) / 2,
+            "Banyak Film": self._load("rating_hist.count"),
+            "Dari": edges[:-1],
+            "Sampai": edges[1:],
+        })
+
+    # --- Data Aktor ---
+    def actor_summary_size(self):
+        return len(self._load("actor_summary.films"))
+
+    def actor_summary(self, rows=None):
+        """Ringkasan per aktor; ``rows`` (slice/indeks) untuk mengambil sebagian saja."""
+        films = self._load("actor_summary.films")
+        rating = self._load("actor_summary.rating")
+        votes = self._load("actor_summary.votes")
+        codes = np.arange(len(films))
+        if rows is not None:
+            codes = codes[rows]
+        return pd.DataFrame({
+            "Actor": self._actors(codes),
+            "Jumlah Film": films[codes],
+            "Rata-rata Rating": rating[codes],
+            "Total Votes": votes[codes],
+        }, copy=False)
+
+    def top_actors_by_rating(self):
+        return self.actor_summary(rows=self._load("top_actors_rating"))
+
+    def top_actors_by_films(self):
+        return self.actor_summary(rows=self._load("top_actors_films"))
@@ -0,0 +1,164 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datastore import (
+    DataStore,
+    PrefixIndex,
+    StringDictionary,
+    _CodeRuns,
+    _counting_sort,
+    _StringRuns,
+    build_store,
+)
+
+# Nama dengan huruf non-ASCII dan pasangan yang sama setelah casefold
+NAMES = ["Zoë", "zoe", "ZOË", "Straße", "STRASSE", "İstanbul", "istanbul", "Ångström",
+         "alpha", "Alpha", "beta", "Émile", "emile", "李小龙", "O'Neil", "o'neil", "Bob", "bob"]
+
+
+def _random_names(rng, n):
+    return [NAMES[i] + (f" {j}" if j else "") for i, j in
+            zip(rng.integers(0, len(NAMES), n), rng.integers(0, 40, n))]
+
+
+def _random_frame(rng, n):
+    return pd.DataFrame({
+        "Actor": _random_names(rng, n),
+        "Film": [f"Film {i}" for i in rng.integers(0, n // 3, n)],
+        "Year": rng.choice([0, 1950, 1990, 2005, 2020], n).astype(np.int32),
+        "Votes": rng.integers(0, 10_000, n),
+        "Rating": np.round(rng.uniform(1, 10, n), 1),
+    })
+
+
+# ===============================
+# SORT EKSTERNAL
+# ===============================
+def test_string_runs_merge_in_str_order(tmp_path):
+    rng = np.random.default_rng(0)
+    runs = _StringRuns(str(tmp_path), "names")
+    expected = []
+    for start in range(0, 300, 70):
+        names = sorted(_random_names(rng, 70))
+        runs.add(names, np.arange(start, start + len(names)))
+        expected += zip(names, range(start, start + len(names)))
+    merged = [(encoded.decode("utf-8"), code) for encoded, code, _ in runs.merged(memory_rows=16)]
+    assert merged == sorted(expected)
+
+
+def test_code_runs_match_sorted_categories(tmp_path):
+    rng = np.random.default_rng(1)
+    chunks = [_random_names(rng, n) for n in (500, 1, 333, 800)]
+    runs = _CodeRuns(str(tmp_path), "actor")
+    for chunk in chunks:
+        runs.encode(pd.Series(chunk))
+    runs.finish(str(tmp_path), "actor_names", "actor_codes", memory_rows=32)
+
+    values = np.concatenate(chunks)
+    expected = pd.Categorical(values, categories=sorted(set(values)))
+    names = StringDictionary.load(str(tmp_path), "actor_names")
+    assert names.to_list() == list(expected.categories)
+    np.testing.assert_array_equal(np.load(tmp_path / "actor_codes.npy"), expected.codes)
+
+
+class _Rows:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, values):
+        self.parts.append(np.asarray(values, dtype=np.int64))
+
+
+@pytest.mark.parametrize("memory_rows", [7, 64, 10_000])
+def test_counting_sort_matches_stable_argsort(memory_rows):
+    rng = np.random.default_rng(2)
+    # Kode 3 sendirian melebihi memory_rows: barisnya dialirkan langsung
+    codes = np.concatenate([rng.integers(0, 50, 900), np.full(120, 3)])
+    rng.shuffle(codes)
+    n_codes = 60
+
+    def blocks():
+        for start in range(0, len(codes), 100):
+            yield start, codes[start:start + 100]
+
+    rows = _Rows()
+    offsets = _counting_sort(blocks, n_codes, rows, memory_rows)
+    np.testing.assert_array_equal(np.concatenate(rows.parts), np.argsort(codes, kind="stable"))
+    np.testing.assert_array_equal(offsets, np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_codes))]))
+
+
+def test_prefix_index_sorted_by_casefold_then_code(tmp_path):
+    rng = np.random.default_rng(3)
+    names = sorted(set(_random_names(rng, 600)))
+    StringDictionary.from_strings(names).save(str(tmp_path), "actor_names")
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    PrefixIndex.build(str(tmp_path), "actor_search", "actor_names", str(scratch), memory_rows=50)
+
+    index = PrefixIndex.load(str(tmp_path), "actor_search")
+    expected = sorted((name.casefold(), code) for code, name in enumerate(names))
+    assert index.keys.to_list() == [key for key, _ in expected]
+    np.testing.assert_array_equal(index.codes, [code for _, code in expected])
+
+    codes, total = index.search("zo", limit=5)
+    matches = [code for key, code in expected if key.startswith("zo")]
+    assert total == len(matches)
+    np.testing.assert_array_equal(codes, matches[:5])
+
+
+# ===============================
+# INGEST DENGAN MEMORI KECIL
+# ===============================
+@pytest.fixture
+def small_store(tmp_path):
+    rng = np.random.default_rng(4)
+    df = _random_frame(rng, 12_000)
+    csv_path = str(tmp_path / "films.csv")
+    df.to_csv(csv_path, index=False)
+    # Chunk CSV, blok indeks dan blok nama jauh lebih kecil dari datasetnya
+    build_store(csv_path, memory_mb=0.01)
+    return df, DataStore(os.path.splitext(csv_path)[0] + ".store")
+
+
+def test_build_store_matches_pandas(small_store):
+    df, store = small_store
+    for name, column in (("actor", "Actor"), ("film", "Film")):
+        expected = pd.Categorical(df[column], categories=sorted(set(df[column])))
+        assert getattr(store, f"{name}_names").to_list() == list(expected.categories)
+        np.testing.assert_array_equal(getattr(store, f"{name}_codes"), expected.codes)
+
+        index = getattr(store, f"{name}_index")
+        np.testing.assert_array_equal(index.rows, np.argsort(expected.codes, kind="stable"))
+        np.testing.assert_array_equal(np.diff(index.offsets), np.bincount(expected.codes))
+
+        search = getattr(store, f"{name}_search")
+        folded = sorted((value.casefold(), code) for code, value in enumerate(expected.categories))
+        np.testing.assert_array_equal(search.codes, [code for _, code in folded])
+
+    np.testing.assert_array_equal(store.rating, df["Rating"])
+    np.testing.assert_array_equal(store.year, df["Year"])
+
+
+def test_build_store_stats_match_pandas(small_store):
+    df, store = small_store
+    films = df[["Film", "Year", "Rating", "Votes"]].drop_duplicates()
+    table = store.stats.film_table()
+    assert table["Film"].tolist() == films["Film"].tolist()
+    np.testing.assert_array_equal(table["Rating"], films["Rating"])
+
+    known = films[films["Year"] != 0]
+    yearly = known.groupby("Year").size()
+    np.testing.assert_array_equal(store.stats.yearly_counts()["Jumlah Film"], yearly.to_numpy())
+
+    actors = df.groupby("Actor").agg(films=("Film", "count"), rating=("Rating", "mean"),
+                                     votes=("Votes", "sum"))
+    summary = store.stats.actor_summary()
+    assert summary["Actor"].tolist() == actors.index.tolist()
+    np.testing.assert_array_equal(summary["Jumlah Film"], actors["films"])
+    np.testing.assert_allclose(summary["Rata-rata Rating"], actors["rating"])
+    np.testing.assert_array_equal(summary["Total Votes"], actors["votes"])
+    assert store.stats.summary["first_year"] == known["Year"].min()
+    assert store.stats.summary["latest_year"] == known["Year"].max()
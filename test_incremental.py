@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from datastore import DataStore, InvertedIndex, build_store
+from engine import MODEL_DIR, RecommendationEngine
+from incremental import apply_delta, update_neighbor_table
+from recommender import ActorRecommender
+
+
+def _frame(rng, n, actors, films):
+    return pd.DataFrame({
+        "Actor": rng.choice(actors, n),
+        "Film": rng.choice(films, n),
+        "Year": rng.choice([0, 1975, 1999, 2012], n),
+        "Votes": rng.integers(0, 5000, n),
+        "Rating": np.round(rng.uniform(1, 10, n), 1),
+    })
+
+
+# ===============================
+# INDEKS TERBALIK
+# ===============================
+@pytest.mark.parametrize("memory_rows", [5, 64, 100_000])
+def test_inverted_index_build_merged_matches_full_build(tmp_path, memory_rows):
+    rng = np.random.default_rng(0)
+    old, new = tmp_path / "old", tmp_path / "new"
+    old.mkdir()
+    new.mkdir()
+    n_codes = 40
+    # Kode lama = kode baru yang tidak termasuk kode yang baru ditambahkan
+    added = np.array([0, 7, 8, 39])
+    code_map = np.setdiff1d(np.arange(n_codes), added)
+    old_codes = rng.integers(0, len(code_map), 500).astype(np.int32)
+    delta_codes = rng.choice(np.concatenate([added, code_map[:5]]), 60)
+
+    np.save(old / "codes.npy", old_codes)
+    InvertedIndex.build(str(old), "index", str(old / "codes.npy"), len(code_map), memory_rows)
+    InvertedIndex.build_merged(str(new), "index", str(old), code_map, n_codes, delta_codes,
+                               len(old_codes), memory_rows)
+
+    np.save(tmp_path / "all.npy", np.concatenate([code_map[old_codes], delta_codes]).astype(np.int32))
+    InvertedIndex.build(str(tmp_path), "index", str(tmp_path / "all.npy"), n_codes, memory_rows)
+    merged, full = InvertedIndex.load(str(new), "index"), InvertedIndex.load(str(tmp_path), "index")
+    np.testing.assert_array_equal(merged.offsets, full.offsets)
+    np.testing.assert_array_equal(merged.rows, full.rows)
+
+
+# ===============================
+# TABEL TETANGGA
+# ===============================
+def _normalized(rng, n_rows, n_terms):
+    matrix = sp.random(n_rows, n_terms, density=0.15, random_state=rng, format="csr")
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    return (sp.diags(1 / np.maximum(norms, 1e-12)) @ matrix).tocsr()
+
+
+def test_update_neighbor_table_matches_full_build_when_k_covers_all_actors():
+    rng = np.random.default_rng(1)
+    n_actors, n_terms = 60, 30
+    matrix = _normalized(rng, n_actors, n_terms)
+    # 10 aktor baru, 5 aktor lama yang dokumennya berubah
+    actor_map = np.sort(rng.choice(n_actors, n_actors - 10, replace=False))
+    changed = rng.choice(actor_map, 5, replace=False)
+    affected = np.union1d(np.setdiff1d(np.arange(n_actors), actor_map), changed)
+    old_matrix = matrix[actor_map].tolil()
+    replaced = _normalized(rng, len(changed), n_terms)
+    for i, code in enumerate(changed):
+        old_matrix[np.searchsorted(actor_map, code)] = replaced[i].toarray()
+    old_model = ActorRecommender(None, old_matrix.tocsr(), np.arange(len(actor_map)).astype(str))
+
+    k = n_actors
+    old_model.build_neighbor_table(k=k)
+    ids, scores = update_neighbor_table(old_model.neighbor_ids, old_model.neighbor_scores,
+                                        actor_map, matrix, affected)
+    full = ActorRecommender(None, matrix, np.arange(n_actors).astype(str))
+    full.build_neighbor_table(k=k)
+    np.testing.assert_array_equal(ids, full.neighbor_ids)
+    np.testing.assert_allclose(scores, full.neighbor_scores, rtol=1e-6)
+
+
+# ===============================
+# DELTA vs BANGUN ULANG PENUH
+# ===============================
+@pytest.fixture
+def dataset(tmp_path):
+    rng = np.random.default_rng(2)
+    actors = [f"Actor {i:03d}" for i in range(300)] + ["Émile", "émile", "Zoë"]
+    films = [f"Film {i}" for i in range(1500)]
+    base = _frame(rng, 9000, actors, films)
+    csv_path = str(tmp_path / "films.csv")
+    base.to_csv(csv_path, index=False)
+
+    delta = _frame(rng, 400, actors + ["Aaron New", "ÉMILE", "Zzz Last"], films + ["Brand New"])
+    # Aktor baru di awal/akhir kamus & bentrok casefold, kombinasi film yang
+    # sudah ada persis, film lama dengan rating baru dan tahun tidak diketahui
+    delta = pd.concat([delta, base.iloc[[3, 4]], pd.DataFrame({
+        "Actor": ["Aaron New", "ÉMILE", "Zzz Last"], "Film": ["Film 1", "Brand New", "Film 2"],
+        "Year": [None, 2020, 1999], "Votes": [1, 2, 3], "Rating": [9.9, 5.0, 0.5],
+    })], ignore_index=True)
+    delta_path = str(tmp_path / "delta.csv")
+    delta.to_csv(delta_path, index=False)
+    return csv_path, delta_path
+
+
+def _assert_same_store(directory, expected):
+    for root, _, files in os.walk(expected):
+        if os.path.relpath(root, expected).startswith(MODEL_DIR):
+            continue
+        for name in files:
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(root, name)
+            actual = np.load(os.path.join(directory, os.path.relpath(path, expected)))
+            wanted = np.load(path)
+            assert actual.dtype == wanted.dtype, name
+            if wanted.dtype.kind == "f":
+                np.testing.assert_allclose(actual, wanted, rtol=1e-12, err_msg=name)
+            else:
+                np.testing.assert_array_equal(actual, wanted, err_msg=name)
+    with open(os.path.join(directory, "stats", "summary.json")) as f:
+        summary = json.load(f)
+    with open(os.path.join(expected, "stats", "summary.json")) as f:
+        assert summary == pytest.approx(json.load(f), rel=1e-12)
+
+
+@pytest.mark.parametrize("with_model", [False, True])
+def test_apply_delta_matches_full_rebuild(dataset, tmp_path, with_model):
+    csv_path, delta_path = dataset
+    if with_model:
+        RecommendationEngine.open(csv_path).recommender
+    else:
+        DataStore.open(csv_path)
+    report = apply_delta(csv_path, delta_path, memory_mb=0.01)
+    assert report["rows_added"] == 405
+    assert (report["refit"] is None) == with_model
+
+    rebuilt = str(tmp_path / "rebuilt.csv")
+    shutil.copy(csv_path, rebuilt)
+    build_store(rebuilt, memory_mb=0.01)
+    store = DataStore.open(csv_path, version=report["version"])
+    assert store.meta == DataStore(str(tmp_path / "rebuilt.store")).meta
+    _assert_same_store(store.directory, str(tmp_path / "rebuilt.store"))
+
+    # Baris model aktor terdampak = dokumen lengkapnya dengan vocabulary/IDF lama
+    model = ActorRecommender.load(os.path.join(store.directory, MODEL_DIR), store.actor_names)
+    assert model.matrix.shape[0] == len(store.actor_names)
+    for actor in ("Aaron New", "ÉMILE", "Zzz Last"):
+        code = store.actor_names.code_of(actor)
+        assert code >= 0
+        document = " ".join(store.film_names.take(store.film_codes[store.actor_index[code]]))
+        np.testing.assert_allclose(model.matrix[code].toarray(),
+                                   model.vectorizer.transform([document]).toarray(), atol=1e-12)